@@ -1,30 +1,92 @@
-from datetime import date, timedelta
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.core.rate_limit import limiter
-from app.core.exceptions import NotFoundException
-from app.core.dependencies import get_api_keys, get_anthropic_key, get_client_ip, check_free_tier_eligible
+from app.core.exceptions import APIException, BadRequestException, NotFoundException
+from app.core.dependencies import get_api_keys, get_anthropic_key, get_client_ip, reserve_free_tier_slot
 from app.schemas.campaign import (
+    BatchGenerationRequest,
     CampaignBrief,
     CopyGenerationResponse,
     ErrorResponse,
     CampaignRecord,
     CampaignListResponse,
+    CampaignListView,
+    CampaignSummary,
+    CampaignSummaryListResponse,
+    CopyBatchJobRequest,
+    CopyBatchJobResponse,
     FreeTierStatusResponse,
 )
 from app.schemas.image import CampaignFullResponse
-from app.services.claude_service import generate_copy
-from app.services.dalle_service import generate_image
-from app.services import campaign_service, free_usage_service
+from app.services.claude_service import build_brief_image_prompt, generate_copy, stream_copy
+from app.services import (
+    batch_service,
+    campaign_service,
+    copy_batch_service,
+    copy_cache_service,
+    export_service,
+    free_usage_service,
+    image_cache_service,
+    image_service,
+)
+from app.services.free_usage_accountant import accountant
 
 
 settings = get_settings()
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
+CACHE_MODE_PATTERN = "^(" + "|".join(copy_cache_service.CACHE_MODES) + ")$"
+CACHE_MODE_DESCRIPTION = "Generation cache: 'default' reads and writes, 'refresh' skips the read, 'bypass' skips the cache"
+IMAGE_CACHE_DESCRIPTION = "Image cache for identical prompts: 'default', 'refresh' or 'bypass'"
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _timed(awaitable, timings: dict[str, float], stage: str):
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = _elapsed_ms(started)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _batch_job_response(job) -> CopyBatchJobResponse:
+    return CopyBatchJobResponse(
+        success=True,
+        job_id=job.id,
+        status=job.status,
+        request_count=len(job.briefs),
+        succeeded_count=job.succeeded_count,
+        errored_count=job.errored_count,
+        results=job.results,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+    )
+
+
+async def _save_campaign_in_background(**kwargs) -> None:
+    # The request-scoped session is closed once the response is sent, so
+    # background saves need a session of their own.
+    async with AsyncSessionLocal() as db:
+        campaign = await campaign_service.save_campaign(db=db, **kwargs)
+    if campaign.image_url:
+        await image_service.mirror_campaign_image(campaign.id, campaign.image_url)
+
 
 @router.post(
     "/generate-copy",
@@ -41,10 +103,147 @@ router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 @limiter.limit("5/minute")
 async def generate_campaign_copy(
     request: Request,
+    response: Response,
     brief: CampaignBrief,
+    cache: str = Query(default="default", pattern=CACHE_MODE_PATTERN, description=CACHE_MODE_DESCRIPTION),
     anthropic_key: str = Depends(get_anthropic_key),
+    db: AsyncSession = Depends(get_db),
 ) -> CopyGenerationResponse:
-    return await generate_copy(brief, anthropic_key)
+    copy_result, cache_status = await copy_cache_service.generate_copy_cached(
+        db, brief, anthropic_key, mode=cache
+    )
+    response.headers.update(copy_cache_service.cache_headers(cache_status))
+    return copy_result
+
+
+@router.post(
+    "/generate-copy/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Server-Sent Events: one `copy` event per platform, then `image_prompt` and `done`",
+            "content": {"text/event-stream": {}},
+        },
+        401: {"model": ErrorResponse, "description": "API key required"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+        502: {"model": ErrorResponse, "description": "Upstream AI service error"},
+    },
+    summary="Stream social media copy as it is generated",
+)
+@limiter.limit("5/minute")
+async def stream_campaign_copy(
+    request: Request,
+    brief: CampaignBrief,
+    include_image_prompt: bool = Query(default=True),
+    anthropic_key: str = Depends(get_anthropic_key),
+) -> StreamingResponse:
+    events = stream_copy(brief, anthropic_key, include_image_prompt=include_image_prompt)
+    # Wait for the first event so upstream errors (bad key, rate limit) are
+    # still returned as regular JSON error responses.
+    first_event = await anext(events)
+
+    async def event_stream():
+        yield _sse_event(*first_event)
+        try:
+            async for event in events:
+                yield _sse_event(*event)
+        except APIException as e:
+            yield _sse_event("error", e.detail)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/generate-batch",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "NDJSON: one line per brief in completion order, then a summary line",
+            "content": {"application/x-ndjson": {}},
+        },
+        400: {"model": ErrorResponse, "description": "Too many briefs"},
+        401: {"model": ErrorResponse, "description": "API key required"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Generate copy for many briefs at once",
+)
+@limiter.limit("2/minute")
+async def generate_batch(
+    request: Request,
+    batch: BatchGenerationRequest,
+    anthropic_key: str = Depends(get_anthropic_key),
+) -> StreamingResponse:
+    if len(batch.briefs) > settings.batch_max_briefs:
+        raise BadRequestException(
+            error="batch_too_large",
+            detail=f"A batch may contain at most {settings.batch_max_briefs} briefs.",
+        )
+
+    return StreamingResponse(
+        batch_service.stream_batch(batch.briefs, anthropic_key, save=batch.save),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(
+    "/batch-jobs",
+    response_model=CopyBatchJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {"model": ErrorResponse, "description": "Too many briefs"},
+        401: {"model": ErrorResponse, "description": "API key required"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Submit briefs for offline generation via Message Batches",
+)
+@limiter.limit("2/minute")
+async def create_batch_job(
+    request: Request,
+    job_request: CopyBatchJobRequest,
+    anthropic_key: str = Depends(get_anthropic_key),
+    db: AsyncSession = Depends(get_db),
+) -> CopyBatchJobResponse:
+    if len(job_request.briefs) > settings.batch_job_max_briefs:
+        raise BadRequestException(
+            error="batch_too_large",
+            detail=f"A batch job may contain at most {settings.batch_job_max_briefs} briefs.",
+        )
+
+    job = await copy_batch_service.submit_job(
+        db,
+        job_request.briefs,
+        anthropic_key,
+        include_image_prompt=job_request.include_image_prompt,
+        save=job_request.save,
+    )
+    return _batch_job_response(job)
+
+
+@router.get(
+    "/batch-jobs/{job_id}",
+    response_model=CopyBatchJobResponse,
+    summary="Poll a Message Batches job",
+    description="Checks the batch with Anthropic using the caller's key and stores the parsed results once it has ended.",
+)
+@limiter.limit("30/minute")
+async def get_batch_job(
+    request: Request,
+    job_id: int,
+    anthropic_key: str = Depends(get_anthropic_key),
+    db: AsyncSession = Depends(get_db),
+) -> CopyBatchJobResponse:
+    job = await copy_batch_service.get_job(db, job_id, anthropic_key)
+    if not job:
+        raise NotFoundException(
+            error="Batch job not found",
+            detail=f"No batch job exists with ID {job_id}",
+        )
+    job = await copy_batch_service.refresh_job(db, job, anthropic_key)
+    return _batch_job_response(job)
 
 
 @router.post(
@@ -56,6 +255,7 @@ async def generate_campaign_copy(
         401: {"model": ErrorResponse, "description": "API keys required"},
         429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
         500: {"model": ErrorResponse, "description": "Server error"},
+        503: {"model": ErrorResponse, "description": "Copy provider unavailable (circuit open)"},
     },
     summary="Generate full campaign with image",
 )
@@ -63,33 +263,75 @@ async def generate_campaign_copy(
 async def generate_full_campaign(
     request: Request,
     brief: CampaignBrief,
+    background_tasks: BackgroundTasks,
     api_keys: dict = Depends(get_api_keys),
     save: bool = Query(default=True, description="Save campaign to database"),
+    pipeline: bool = Query(
+        default=False,
+        description="Generate the image from the brief concurrently with the copy and save in the background",
+    ),
+    image_cache: str = Query(default="default", pattern=CACHE_MODE_PATTERN, description=IMAGE_CACHE_DESCRIPTION),
     db: AsyncSession = Depends(get_db),
 ) -> CampaignFullResponse:
-    copy_result = await generate_copy(brief, api_keys["anthropic_key"])
-
-    image_url = None
-    revised_prompt = None
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
 
-    try:
-        image_result = await generate_image(
-            prompt=copy_result.image_prompt,
-            api_key=api_keys["openai_key"],
+    if pipeline:
+        image_prompt = build_brief_image_prompt(brief)
+        image_task = asyncio.create_task(
+            _timed(
+                image_cache_service.try_generate_image(db, image_prompt, api_keys["openai_key"], image_cache),
+                timings,
+                "image_ms",
+            )
+        )
+        try:
+            copy_result = await _timed(
+                generate_copy(brief, api_keys["anthropic_key"], include_image_prompt=False),
+                timings,
+                "copy_ms",
+            )
+        except BaseException:
+            image_task.cancel()
+            raise
+        copy_result.image_prompt = image_prompt
+        image_result, image_status = await image_task
+    else:
+        copy_result = await _timed(generate_copy(brief, api_keys["anthropic_key"]), timings, "copy_ms")
+        image_result, image_status = await _timed(
+            image_cache_service.try_generate_image(db, copy_result.image_prompt, api_keys["openai_key"], image_cache),
+            timings,
+            "image_ms",
         )
-        image_url = image_result["image_url"]
-        revised_prompt = image_result["revised_prompt"]
-    except Exception:
-        pass
-
-    if save:
-        await campaign_service.save_campaign(
-            db=db,
+
+    image_url = image_result["image_url"] if image_result else None
+    revised_prompt = image_result["revised_prompt"] if image_result else None
+
+    if save and pipeline:
+        background_tasks.add_task(
+            _save_campaign_in_background,
             brief=brief,
             copies=copy_result.copies,
             image_prompt=copy_result.image_prompt,
             image_url=image_url,
         )
+    elif save:
+        campaign = await _timed(
+            campaign_service.save_campaign(
+                db=db,
+                brief=brief,
+                copies=copy_result.copies,
+                image_prompt=copy_result.image_prompt,
+                image_url=image_url,
+            ),
+            timings,
+            "save_ms",
+        )
+        if image_url:
+            # DALL-E URLs expire; copy the image to our storage after responding.
+            background_tasks.add_task(image_service.mirror_campaign_image, campaign.id, image_url)
+
+    timings["total_ms"] = _elapsed_ms(started)
 
     return CampaignFullResponse(
         success=True,
@@ -98,7 +340,8 @@ async def generate_full_campaign(
         image_prompt=copy_result.image_prompt,
         image_url=image_url,
         revised_image_prompt=revised_prompt,
-        message="Campaign generated successfully" if image_url else "Copy generated, image generation failed",
+        message=image_cache_service.image_message(image_status, "Campaign generated successfully"),
+        timings=timings,
     )
 
 
@@ -116,47 +359,53 @@ async def generate_full_campaign(
 @limiter.limit("5/minute")
 async def generate_free_campaign(
     request: Request,
+    response: Response,
     brief: CampaignBrief,
+    background_tasks: BackgroundTasks,
     generate_image_flag: bool = Query(default=False, alias="generate_image"),
-    ip: str = Depends(check_free_tier_eligible),
+    cache: str = Query(default="default", pattern=CACHE_MODE_PATTERN, description=CACHE_MODE_DESCRIPTION),
+    image_cache: str = Query(default="default", pattern=CACHE_MODE_PATTERN, description=IMAGE_CACHE_DESCRIPTION),
+    reservation: dict = Depends(reserve_free_tier_slot),
     db: AsyncSession = Depends(get_db),
 ) -> CampaignFullResponse:
-    copy_result = await generate_copy(
-        brief, settings.anthropic_api_key, include_image_prompt=generate_image_flag
-    )
+    remaining = reservation["remaining"]
+    try:
+        copy_result, cache_status = await copy_cache_service.generate_copy_cached(
+            db, brief, settings.anthropic_api_key, include_image_prompt=generate_image_flag, mode=cache
+        )
+    except BaseException:
+        # Generation failed, so hand the reserved slot back.
+        if settings.free_tier_write_behind:
+            accountant.release_slot(reservation["ip"], reservation["date"])
+        else:
+            await free_usage_service.release_slot(db, reservation["ip"], reservation["date"])
+        raise
+    response.headers.update(copy_cache_service.cache_headers(cache_status))
 
     image_url = None
     revised_prompt = None
-    image_failed = False
+    image_status = "ok"
 
     if generate_image_flag:
-        try:
-            image_result = await generate_image(
-                prompt=copy_result.image_prompt,
-                api_key=settings.openai_api_key,
-            )
+        image_result, image_status = await image_cache_service.try_generate_image(
+            db, copy_result.image_prompt, settings.openai_api_key, image_cache
+        )
+        if image_result:
             image_url = image_result["image_url"]
             revised_prompt = image_result["revised_prompt"]
-        except Exception:
-            image_failed = True
-
-    await free_usage_service.increment_usage(db, ip)
-    remaining = await free_usage_service.get_remaining(db, ip)
 
-    await campaign_service.save_campaign(
+    campaign = await campaign_service.save_campaign(
         db=db,
         brief=brief,
         copies=copy_result.copies,
         image_prompt=copy_result.image_prompt,
         image_url=image_url,
     )
-
     if image_url:
-        msg = f"Campaign generated successfully ({remaining} free generations remaining today)"
-    elif image_failed:
-        msg = f"Copy generated, image generation failed ({remaining} free generations remaining today)"
-    else:
-        msg = f"Copy generated successfully ({remaining} free generations remaining today)"
+        background_tasks.add_task(image_service.mirror_campaign_image, campaign.id, image_url)
+
+    success = "Campaign generated successfully" if image_url else "Copy generated successfully"
+    msg = f"{image_cache_service.image_message(image_status, success)} ({remaining} free generations remaining today)"
 
     return CampaignFullResponse(
         success=True,
@@ -180,7 +429,10 @@ async def free_tier_status(
     db: AsyncSession = Depends(get_db),
 ) -> FreeTierStatusResponse:
     ip = get_client_ip(request)
-    remaining = await free_usage_service.get_remaining(db, ip)
+    if settings.free_tier_write_behind:
+        remaining = await accountant.get_remaining(db, ip)
+    else:
+        remaining = await free_usage_service.get_remaining(db, ip)
     tomorrow = date.today() + timedelta(days=1)
 
     return FreeTierStatusResponse(
@@ -192,7 +444,7 @@ async def free_tier_status(
 
 @router.get(
     "/",
-    response_model=CampaignListResponse,
+    response_model=CampaignListView,
     summary="List saved campaigns",
 )
 @limiter.limit("30/minute")
@@ -200,13 +452,78 @@ async def list_campaigns(
     request: Request,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=10, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="Keyset cursor from a previous next_cursor; overrides skip"),
+    total: str = Query(
+        default="exact",
+        pattern="^(" + "|".join(campaign_service.TOTAL_MODES) + ")$",
+        description="How to compute total: exact count, cached count, planner estimate, or none",
+    ),
+    view: str = Query(
+        default="full",
+        pattern="^(full|summary)$",
+        description="'summary' returns only list-view columns and a short copy preview",
+    ),
     db: AsyncSession = Depends(get_db),
-) -> CampaignListResponse:
-    campaigns, total = await campaign_service.get_campaigns(db, skip, limit)
+) -> CampaignListResponse | CampaignSummaryListResponse:
+    if view == "summary":
+        rows, total_count, next_cursor = await campaign_service.get_campaign_summaries(
+            db, skip, limit, cursor=cursor, total_mode=total
+        )
+        return CampaignSummaryListResponse(
+            success=True,
+            campaigns=[CampaignSummary.model_validate(r) for r in rows],
+            total=total_count,
+            next_cursor=next_cursor,
+        )
+
+    campaigns, total_count, next_cursor = await campaign_service.get_campaigns(
+        db, skip, limit, cursor=cursor, total_mode=total
+    )
     return CampaignListResponse(
         success=True,
         campaigns=[CampaignRecord.model_validate(c) for c in campaigns],
-        total=total,
+        total=total_count,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Every matching campaign, oldest first, as NDJSON or CSV (gzip-compressed if requested)",
+            "content": {"application/x-ndjson": {}, "text/csv": {}, "application/gzip": {}},
+        },
+        400: {"model": ErrorResponse, "description": "Invalid date range"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Export saved campaigns",
+    description="Streams all campaigns from a server-side cursor instead of paging through the list endpoint.",
+)
+@limiter.limit("5/minute")
+async def export_campaigns(
+    request: Request,
+    format: str = Query(default="ndjson", pattern="^(" + "|".join(export_service.EXPORT_FORMATS) + ")$"),
+    gzip: bool = Query(default=False, description="Compress the export with gzip"),
+    since: datetime | None = Query(default=None, description="Only campaigns created at or after this time"),
+    until: datetime | None = Query(default=None, description="Only campaigns created before this time"),
+) -> StreamingResponse:
+    since = export_service.to_utc_naive(since)
+    until = export_service.to_utc_naive(until)
+    if since and until and since >= until:
+        raise BadRequestException(
+            error="invalid_date_range",
+            detail="'since' must be earlier than 'until'.",
+        )
+
+    return StreamingResponse(
+        export_service.stream_export(format, since, until, compress=gzip),
+        media_type=export_service.media_type(format, gzip),
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_service.filename(format, gzip)}"',
+            "X-Accel-Buffering": "no",
+        },
     )
 
 
@@ -1,16 +1,49 @@
-from fastapi import APIRouter, Request, Depends
+import re
 
+from fastapi import APIRouter, Request, Depends, Path, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db
 from app.core.rate_limit import limiter
 from app.core.dependencies import get_openai_key
+from app.core.exceptions import NotFoundException
 from app.schemas.image import (
     ImageGenerationRequest,
     ImageGenerationResponse,
 )
-from app.services.dalle_service import generate_image
+from app.services import copy_cache_service, image_cache_service, image_service
 
 
+settings = get_settings()
 router = APIRouter(prefix="/images", tags=["images"])
 
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+PLATFORM_PATTERN = "^(" + "|".join(image_service.PLATFORM_IMAGE_SIZES) + ")$"
+
+
+def _parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Return the inclusive byte range requested, or None for the whole image.
+
+    Only single ranges are honoured; multi-range requests get the full image.
+    Raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
 
 @router.post(
     "/generate",
@@ -21,16 +54,78 @@ router = APIRouter(prefix="/images", tags=["images"])
 @limiter.limit("3/minute")
 async def generate_marketing_image(
     request: Request,
+    response: Response,
     image_request: ImageGenerationRequest,
     openai_key: str = Depends(get_openai_key),
+    cache: str = Query(
+        default="default",
+        pattern="^(" + "|".join(copy_cache_service.CACHE_MODES) + ")$",
+        description="Image cache for identical prompts: 'default' reads and writes, 'refresh' skips the read, 'bypass' skips the cache",
+    ),
+    db: AsyncSession = Depends(get_db),
 ) -> ImageGenerationResponse:
-    result = await generate_image(
+    result, cache_status = await image_cache_service.generate_image_cached(
+        db,
         prompt=image_request.prompt,
         api_key=openai_key,
         size=image_request.size,
+        mode=cache,
     )
+    response.headers["X-Cache"] = cache_status
     return ImageGenerationResponse(
         success=True,
         image_url=result["image_url"],
         revised_prompt=result["revised_prompt"],
     )
+
+
+@router.get(
+    "/{digest}",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Image bytes"},
+        206: {"description": "Requested byte range"},
+        304: {"description": "Not modified"},
+        404: {"description": "Image not found"},
+        416: {"description": "Range not satisfiable"},
+    },
+    summary="Get a mirrored campaign image",
+    description="Serve a stored image, optionally resized and cropped for a platform",
+)
+@limiter.limit("120/minute")
+async def get_mirrored_image(
+    request: Request,
+    digest: str = Path(..., pattern="^[0-9a-f]{64}$"),
+    platform: str | None = Query(default=None, pattern=PLATFORM_PATTERN),
+):
+    image = await image_service.get_image(digest, platform)
+    if image is None:
+        raise NotFoundException(
+            error="Image not found",
+            detail=f"No stored image exists with hash {digest}",
+        )
+
+    headers = {
+        "ETag": image.etag,
+        "Cache-Control": f"public, max-age={settings.image_cache_max_age_seconds}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if image.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = _parse_range(request.headers.get("range"), image.size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{image.size}"})
+
+    start, end = byte_range or (0, image.size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{image.size}"
+
+    return StreamingResponse(
+        image_service.iter_image(image, start, end),
+        status_code=206 if byte_range else 200,
+        media_type=image.content_type,
+        headers=headers,
+    )
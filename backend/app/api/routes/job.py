@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_anthropic_key, get_api_keys
+from app.core.exceptions import NotFoundException
+from app.core.rate_limit import limiter
+from app.schemas.campaign import ErrorResponse
+from app.schemas.job import CampaignJobRequest, CampaignJobResponse
+from app.services import job_service
+from app.services.job_service import worker_pool
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post(
+    "",
+    response_model=CampaignJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        202: {"description": "Job queued"},
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        401: {"model": ErrorResponse, "description": "API keys required"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Queue a full campaign generation",
+    description="Returns immediately; poll GET /jobs/{job_id} or pass a webhook_url to be notified",
+)
+@limiter.limit("3/minute")
+async def create_campaign_job(
+    request: Request,
+    job_request: CampaignJobRequest,
+    api_keys: dict = Depends(get_api_keys),
+    db: AsyncSession = Depends(get_db),
+) -> CampaignJobResponse:
+    job = await worker_pool.submit(db, job_request, api_keys)
+    return job_service.job_response(job)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=CampaignJobResponse,
+    responses={
+        200: {"description": "Job status"},
+        401: {"model": ErrorResponse, "description": "API key required"},
+        404: {"model": ErrorResponse, "description": "Job not found"},
+    },
+    summary="Get a campaign job",
+    description="Only returned to the Anthropic key the job was submitted with",
+)
+@limiter.limit("60/minute")
+async def get_campaign_job(
+    request: Request,
+    job_id: int,
+    anthropic_key: str = Depends(get_anthropic_key),
+    db: AsyncSession = Depends(get_db),
+) -> CampaignJobResponse:
+    job = await job_service.get_job(db, job_id, anthropic_key)
+    if not job:
+        raise NotFoundException(
+            error="Job not found",
+            detail=f"No job exists with ID {job_id}",
+        )
+    return job_service.job_response(job)
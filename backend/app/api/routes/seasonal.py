@@ -1,23 +1,33 @@
-from fastapi import APIRouter
+from datetime import datetime, time, timedelta
+
+from fastapi import APIRouter, Request, Response
 
 from app.schemas.seasonal import SeasonalResponse
-from app.services.seasonal_service import get_seasonal_suggestions
+from app.services.seasonal_service import get_seasonal_response
 
 
 router = APIRouter(prefix="/seasonal", tags=["seasonal"])
 
 
+def _seconds_until_midnight(now: datetime) -> int:
+    midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+    return max(1, int((midnight - now).total_seconds()))
+
+
 @router.get(
     "/suggestions",
     response_model=SeasonalResponse,
+    responses={304: {"description": "Not modified"}},
     summary="Get UK seasonal marketing suggestions",
 )
-async def get_suggestions() -> SeasonalResponse:
-    data = get_seasonal_suggestions()
-    return SeasonalResponse(
-        success=True,
-        current_season=data["current_season"],
-        active_events=data["active_events"],
-        upcoming_events=data["upcoming_events"],
-        suggestions=data["suggestions"],
-    )
+async def get_suggestions(request: Request) -> Response:
+    now = datetime.now()
+    body, etag = get_seasonal_response(now.date())
+    headers = {
+        "ETag": etag,
+        # Suggestions change at midnight, so caches may keep them until then.
+        "Cache-Control": f"public, max-age={_seconds_until_midnight(now)}",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,94 @@
+import time
+
+import anthropic
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+class AIClientRegistry:
+    """Holds one long-lived SDK client per API key.
+
+    All SDK clients share a single bounded httpx connection pool, so repeated
+    generations reuse warm (HTTP/2) connections instead of paying DNS, TCP and
+    TLS setup on every call. Clients unused for ``idle_ttl`` seconds are evicted.
+    SDK retries are disabled; ``app.core.upstream`` owns retry and backoff.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        http2: bool = True,
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2
+        self._http_client: httpx.AsyncClient | None = None
+        self._anthropic: dict[str, tuple[anthropic.AsyncAnthropic, float]] = {}
+        self._openai: dict[str, tuple[AsyncOpenAI, float]] = {}
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+                timeout=httpx.Timeout(600.0, connect=5.0),
+            )
+        return self._http_client
+
+    def _evict_idle(self, now: float) -> None:
+        # SDK clients are only dropped, never closed: closing one would close
+        # the shared httpx pool underneath every other client.
+        for clients in (self._anthropic, self._openai):
+            expired = [key for key, (_, last_used) in clients.items() if now - last_used > self.idle_ttl]
+            for key in expired:
+                del clients[key]
+
+    def get_anthropic(self, api_key: str) -> anthropic.AsyncAnthropic:
+        now = time.monotonic()
+        self._evict_idle(now)
+        entry = self._anthropic.get(api_key)
+        client = entry[0] if entry else anthropic.AsyncAnthropic(
+            api_key=api_key,
+            http_client=self.get_http_client(),
+            max_retries=0,
+        )
+        self._anthropic[api_key] = (client, now)
+        return client
+
+    def get_openai(self, api_key: str) -> AsyncOpenAI:
+        now = time.monotonic()
+        self._evict_idle(now)
+        entry = self._openai.get(api_key)
+        client = entry[0] if entry else AsyncOpenAI(
+            api_key=api_key,
+            http_client=self.get_http_client(),
+            max_retries=0,
+        )
+        self._openai[api_key] = (client, now)
+        return client
+
+    async def aclose(self) -> None:
+        self._anthropic.clear()
+        self._openai.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+ai_clients = AIClientRegistry(
+    idle_ttl=settings.ai_client_idle_ttl_seconds,
+    max_connections=settings.ai_http_max_connections,
+    max_keepalive_connections=settings.ai_http_max_keepalive_connections,
+    http2=settings.ai_http2,
+)
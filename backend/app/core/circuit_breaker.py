@@ -0,0 +1,95 @@
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from app.core.exceptions import CircuitOpenException
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-provider circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls are rejected immediately. Once ``recovery_timeout`` seconds have
+    passed it goes half-open and lets a single probe call through: success
+    closes it again, failure re-opens it for another ``recovery_timeout``.
+
+    ``is_failure`` decides which errors count against the provider; any other
+    outcome shows the provider is answering and counts as a success.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+    ):
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 0
+        return max(1, int(self.recovery_timeout - (time.monotonic() - self.opened_at)) + 1)
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenException`` unless the call may go ahead."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenException(service=self.name, retry_after=self.retry_after())
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def record_cancelled(self) -> None:
+        # An abandoned probe proves nothing; let the next caller probe instead.
+        self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self.record_cancelled()
+            raise
+        self.record_success()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
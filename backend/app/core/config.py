@@ -1,4 +1,5 @@
 from functools import lru_cache
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,15 +17,86 @@ class Settings(BaseSettings):
     anthropic_api_key: str = ""
     openai_api_key: str = ""
 
+    copy_output_mode: str = Field(default="markers", pattern="^(markers|tool)$")
+    copy_limit_retries: int = 1
+
+    ai_client_idle_ttl_seconds: int = 600
+    ai_http_max_connections: int = 100
+    ai_http_max_keepalive_connections: int = 20
+    ai_http2: bool = True
+    upstream_initial_concurrency: int = 4
+    upstream_min_concurrency: int = 1
+    upstream_max_concurrency: int = 32
+    upstream_max_retries: int = 3
+    upstream_backoff_base_seconds: float = 0.5
+    upstream_backoff_max_seconds: float = 8.0
+    upstream_deadline_seconds: float = 60.0
+    upstream_generation_deadline_seconds: float = 600.0
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_seconds: float = 30.0
+
     database_url: str = ""
+    database_null_pool: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: int = 30
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_statement_cache_size: int = 100
 
     frontend_url: str = "http://localhost:5173"
 
     rate_limit_requests: int = 10
     rate_limit_window_seconds: int = 60
+    rate_limit_storage_uri: str = "memory://"
+    rate_limit_strategy: str = Field(
+        default="sliding-window-counter",
+        pattern="^(sliding-window-counter|moving-window|fixed-window)$",
+    )
+    rate_limit_prefilter_fraction: float = 0.1
+    rate_limit_prefilter_max_keys: int = 10000
+    # Reverse proxies in front of the app that append to X-Forwarded-For (Railway adds one).
+    trusted_proxy_hops: int = Field(default=1, ge=0)
 
     free_tier_enabled: bool = True
     free_tier_daily_limit: int = 5
+    free_tier_write_behind: bool = False
+    free_tier_flush_interval_seconds: int = 10
+
+    batch_max_briefs: int = 50
+    batch_max_concurrency: int = 8
+    batch_max_concurrency_per_key: int = 4
+    batch_job_max_briefs: int = 1000
+
+    export_batch_size: int = 500
+
+    copy_cache_enabled: bool = True
+    copy_cache_ttl_seconds: int = 3600
+    copy_cache_max_entries: int = 512
+    copy_cache_shared: bool = False
+    copy_cache_key_ttl_seconds: int = 600
+
+    public_base_url: str = ""
+    image_mirror_enabled: bool = True
+    image_storage_backend: str = Field(default="local", pattern="^(local|s3)$")
+    image_storage_path: str = "./data/images"
+    image_s3_bucket: str = ""
+    image_s3_endpoint_url: str = ""
+    image_s3_access_key: str = ""
+    image_s3_secret_key: str = ""
+    image_s3_region: str = "us-east-1"
+    image_cache_max_age_seconds: int = 31536000
+    image_memory_cache_entries: int = 64
+
+    image_cache_enabled: bool = True
+    image_cache_ttl_seconds: int = 604800
+    image_cache_max_bytes: int = 1073741824
+
+    job_workers: int = 4
+    job_retry_interval_seconds: float = 5.0
+    job_stale_seconds: int = 900
+    job_webhook_secret: str = ""
+    job_webhook_attempts: int = 3
 
     @property
     def cors_origins(self) -> list[str]:
@@ -28,10 +28,29 @@ def get_database_url() -> str:
     return url
 
 
+def get_engine_options() -> dict:
+    if settings.database_null_pool:
+        # PgBouncer in transaction mode hands out a different server connection
+        # per transaction, so neither client-side pooling nor asyncpg's prepared
+        # statement cache can be used safely.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {"statement_cache_size": 0},
+        }
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "connect_args": {"statement_cache_size": settings.database_statement_cache_size},
+    }
+
+
 engine = create_async_engine(
     get_database_url(),
     echo=settings.debug,
-    poolclass=NullPool,
+    **get_engine_options(),
 )
 
 AsyncSessionLocal = async_sessionmaker(
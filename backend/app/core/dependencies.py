@@ -1,11 +1,16 @@
+import hashlib
+import hmac
 import re
+from datetime import date
 from fastapi import Header, HTTPException, Request, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.exceptions import APIException, RateLimitException, ServiceUnavailableException
+from app.core.rate_limit import get_client_ip
 from app.services import free_usage_service
+from app.services.free_usage_accountant import accountant
 
 
 settings = get_settings()
@@ -19,19 +24,19 @@ def validate_openai_key(key: str) -> bool:
     return bool(re.match(r'^sk-[a-zA-Z0-9-_]{20,}$', key))
 
 
-def get_client_ip(request: Request) -> str:
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    if request.client:
-        return request.client.host
-    return "unknown"
+def hash_api_key(key: str) -> str:
+    """Fingerprint stored with a job so only the submitting key can read it back."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
 
 
-async def check_free_tier_eligible(
+def api_key_matches(key_hash: str, key: str) -> bool:
+    return hmac.compare_digest(key_hash, hash_api_key(key))
+
+
+async def reserve_free_tier_slot(
     request: Request,
     db: AsyncSession = Depends(get_db),
-) -> str:
+) -> dict:
     if not settings.free_tier_enabled:
         raise APIException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -46,18 +51,26 @@ async def check_free_tier_eligible(
         )
 
     ip = get_client_ip(request)
-    can_use = await free_usage_service.can_generate(db, ip)
+    usage_date = date.today()
+    if settings.free_tier_write_behind:
+        remaining = await accountant.reserve_slot(db, ip, usage_date)
+    else:
+        remaining = await free_usage_service.reserve_slot(db, ip, usage_date)
 
-    if not can_use:
-        remaining = await free_usage_service.get_remaining(db, ip)
+    if remaining is None:
         raise RateLimitException(
             error="free_tier_limit_reached",
             detail=f"Daily free tier limit of {settings.free_tier_daily_limit} generations reached. Try again tomorrow or use your own API keys.",
-            remaining=remaining,
+            remaining=0,
             limit=settings.free_tier_daily_limit,
         )
 
-    return ip
+    return {
+        "ip": ip,
+        "remaining": remaining,
+        # Refunds go back to this day's count, even if midnight passes mid-request.
+        "date": usage_date,
+    }
 
 
 async def get_api_keys(
@@ -31,7 +31,7 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
     }
     return JSONResponse(
         status_code=exc.status_code,
-        headers=_cors_headers(request),
+        headers={**(exc.headers or {}), **_cors_headers(request)},
         content=content,
     )
 
@@ -7,6 +7,7 @@ class APIException(HTTPException):
         status_code: int,
         error: str,
         detail: str | None = None,
+        headers: dict[str, str] | None = None,
         **extra,
     ):
         body = {
@@ -18,6 +19,7 @@ class APIException(HTTPException):
         super().__init__(
             status_code=status_code,
             detail=body,
+            headers=headers,
         )
 
 
@@ -65,3 +67,27 @@ class AIServiceException(APIException):
             error=f"{service} service error",
             detail=detail,
         )
+
+
+class UpstreamTimeoutException(APIException):
+    def __init__(self, service: str, detail: str | None = None):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            error=f"{service} service timeout",
+            detail=detail or "The AI provider is busy and did not respond in time. Please try again shortly.",
+        )
+
+
+class UpstreamQueueTimeoutException(UpstreamTimeoutException):
+    """The deadline passed while waiting for our own concurrency limit, before anything was sent."""
+
+
+class CircuitOpenException(APIException):
+    def __init__(self, service: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error=f"{service} service unavailable",
+            detail="The AI provider is currently failing. Please try again shortly.",
+            headers={"Retry-After": str(retry_after)},
+            retry_after=retry_after,
+        )
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+}
+
+
+def content_type_for(key: str) -> str:
+    return CONTENT_TYPES.get(Path(key).suffix, "application/octet-stream")
+
+
+class LocalImageStorage:
+    """Content-addressed image objects on the local filesystem.
+
+    Keys are spread over two-character subdirectories; writes go through a
+    temporary file and an atomic rename so readers never see partial objects.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _size(self, key: str) -> int | None:
+        try:
+            return self._path(key).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def _put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read(self, key: str, start: int, length: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    async def size(self, key: str) -> int | None:
+        return await asyncio.to_thread(self._size, key)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._put, key, data)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    async def get(self, key: str) -> bytes | None:
+        size = await self.size(key)
+        if size is None:
+            return None
+        return await asyncio.to_thread(self._read, key, 0, size)
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        position = start
+        while position <= end:
+            chunk = await asyncio.to_thread(self._read, key, position, min(CHUNK_SIZE, end - position + 1))
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
+
+
+class S3ImageStorage:
+    """Content-addressed image objects in an S3-compatible bucket (AWS S3, MinIO)."""
+
+    def __init__(self, bucket: str, endpoint_url: str, access_key: str, secret_key: str, region: str):
+        import boto3
+        from botocore.exceptions import ClientError
+
+        self.bucket = bucket
+        self._client_error = ClientError
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            region_name=region,
+        )
+
+    def _size(self, key: str) -> int | None:
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except self._client_error as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def size(self, key: str) -> int | None:
+        return await asyncio.to_thread(self._size, key)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(
+            self._client.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type_for(key),
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            response = await asyncio.to_thread(self._client.get_object, Bucket=self.bucket, Key=key)
+        except self._client_error as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        response = await asyncio.to_thread(
+            self._client.get_object,
+            Bucket=self.bucket,
+            Key=key,
+            Range=f"bytes={start}-{end}",
+        )
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+
+def get_image_storage() -> LocalImageStorage | S3ImageStorage:
+    if settings.image_storage_backend == "s3":
+        return S3ImageStorage(
+            bucket=settings.image_s3_bucket,
+            endpoint_url=settings.image_s3_endpoint_url,
+            access_key=settings.image_s3_access_key,
+            secret_key=settings.image_s3_secret_key,
+            region=settings.image_s3_region,
+        )
+    return LocalImageStorage(settings.image_storage_path)
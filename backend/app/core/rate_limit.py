@@ -1,12 +1,111 @@
+import time
+
+from fastapi import Request
+from limits import RateLimitItem
+from limits.strategies import RateLimiter
 from slowapi import Limiter
-from slowapi.util import get_remote_address
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 
 
 settings = get_settings()
 
-limiter = Limiter(
-    key_func=get_remote_address,
+# Local allowances are re-checked against shared storage at least this often.
+PREFILTER_LEASE_SECONDS = 10.0
+
+
+def get_client_ip(request: Request) -> str:
+    """The client address as seen by the outermost trusted proxy.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so only the entry ``trusted_proxy_hops`` from the right
+    is reliable; anything to its left was supplied by the client.
+    """
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded and settings.trusted_proxy_hops:
+        hops = [hop.strip() for hop in forwarded.split(",")]
+        return hops[-min(settings.trusted_proxy_hops, len(hops))]
+    if request.client:
+        return request.client.host
+    return "unknown"
+
+
+class PrefilteredRateLimiter(RateLimiter):
+    """Wraps a shared-storage strategy with a small per-process allowance.
+
+    Whenever a client is checked against shared storage and is clearly under
+    its limit, this process may admit up to ``fraction`` of the limit (and at
+    most half of what remains) for that client without another round trip.
+    Those hits are charged to shared storage on the client's next checked
+    request, so each process can overshoot a limit by at most one allowance.
+    Clients near their limit never get an allowance.
+    """
+
+    def __init__(self, limiter: RateLimiter, fraction: float, max_keys: int):
+        super().__init__(limiter.storage)
+        self.limiter = limiter
+        self.fraction = fraction
+        self._leases = TTLCache(max_entries=max_keys, ttl=3600)
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        key = item.key_for(*identifiers)
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        pending = 0
+        if lease is not None:
+            if now < lease["expires_at"] and lease["used"] + cost <= lease["granted"]:
+                lease["used"] += cost
+                return True
+            # Hits from a window that has since passed are no longer owed.
+            if now - lease["expires_at"] < item.get_expiry():
+                pending = lease["used"]
+            self._leases.delete(key)
+
+        allowed = self.limiter.hit(item, *identifiers, cost=pending + cost)
+        if not allowed and pending:
+            # The locally admitted hits were already served; judge this one on its own.
+            allowed = self.limiter.hit(item, *identifiers, cost=cost)
+        allowance = int(item.amount * self.fraction)
+        # Small limits (e.g. 5/minute) never earn an allowance, so skip the extra round trip.
+        if allowed and allowance > 0:
+            remaining = self.limiter.get_window_stats(item, *identifiers).remaining
+            granted = min(allowance, remaining // 2)
+            if granted > 0:
+                self._leases.set(key, {
+                    "granted": granted,
+                    "used": 0,
+                    "expires_at": now + min(PREFILTER_LEASE_SECONDS, item.get_expiry()),
+                })
+        return allowed
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        return self.limiter.test(item, *identifiers, cost=cost)
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str):
+        return self.limiter.get_window_stats(item, *identifiers)
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        self._leases.delete(item.key_for(*identifiers))
+        self.limiter.clear(item, *identifiers)
+
+
+class SharedLimiter(Limiter):
+    """slowapi limiter whose strategy is wrapped in a local pre-filter."""
+
+    def __init__(self, *args, prefilter_fraction: float, prefilter_max_keys: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        if prefilter_fraction > 0:
+            self._limiter = PrefilteredRateLimiter(self._limiter, prefilter_fraction, prefilter_max_keys)
+
+
+limiter = SharedLimiter(
+    key_func=get_client_ip,
     default_limits=[f"{settings.rate_limit_requests}/{settings.rate_limit_window_seconds}seconds"],
+    storage_uri=settings.rate_limit_storage_uri,
+    strategy=settings.rate_limit_strategy,
+    # Fall back to per-process limits rather than failing requests if shared storage is down.
+    in_memory_fallback_enabled=True,
+    prefilter_fraction=settings.rate_limit_prefilter_fraction,
+    prefilter_max_keys=settings.rate_limit_prefilter_max_keys,
 )
@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+def make_flight_key(*parts: object) -> str:
+    normalised = "\x00".join(" ".join(str(part).split()) for part in parts)
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key into one upstream call.
+
+    Every caller awaits the same task, so results and exceptions reach all of
+    them. A caller being cancelled does not affect the others; the upstream
+    call is only cancelled once its last waiter has gone.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+
+    def _forget(self, key: str, flight: _Flight, _task: asyncio.Task) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._forget(key, flight, task))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
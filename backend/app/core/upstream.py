@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import anthropic
+import openai
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import get_settings
+from app.core.exceptions import UpstreamQueueTimeoutException, UpstreamTimeoutException
+
+
+settings = get_settings()
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+# 429 (rate limited) and 529 (Anthropic overloaded) mean the provider wants less load.
+THROTTLE_STATUS_CODES = {429, 529}
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one provider and API key.
+
+    Each successful call raises the limit by roughly one per "window" of calls
+    (additive increase); each throttled call halves it (multiplicative decrease).
+    Other failures leave it unchanged.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.queued = 0
+        self.last_used = time.monotonic()
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, timeout: float) -> None:
+        async with self._condition:
+            self.queued += 1
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                    timeout,
+                )
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.last_used = time.monotonic()
+
+    async def release(self, succeeded: bool, throttled: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+def _status_code(error: Exception) -> int | None:
+    return getattr(error, "status_code", None)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (anthropic.APIConnectionError, openai.APIConnectionError)):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Whether the error says the provider itself is unhealthy.
+
+    Client-side errors such as a bad key or a per-key rate limit do not count:
+    the provider answered, even if it rejected that particular request. Nor
+    does a deadline spent queueing behind one key's concurrency limit.
+    """
+    if isinstance(error, UpstreamQueueTimeoutException):
+        return False
+    if isinstance(error, UpstreamTimeoutException):
+        return True
+    if isinstance(error, (anthropic.APIConnectionError, openai.APIConnectionError)):
+        return True
+    status_code = _status_code(error)
+    return status_code is not None and (status_code >= 500 or status_code == 408)
+
+
+def retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class UpstreamScheduler:
+    """Admission control and retries for calls to the AI providers.
+
+    Calls are queued behind an adaptive per-provider, per-key concurrency
+    limit, retried with jittered exponential backoff (or the provider's
+    retry-after hint), and abandoned once the request's deadline is spent.
+    A circuit breaker per provider rejects calls outright while it is down.
+    """
+
+    def __init__(self):
+        self._limiters: dict[tuple[str, str], AdaptiveLimiter] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.counters: dict[str, dict[str, int]] = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(
+                name=provider,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                recovery_timeout=settings.circuit_breaker_recovery_seconds,
+                is_failure=is_provider_failure,
+            )
+        return self.breakers[provider]
+
+    def _limiter(self, provider: str, api_key: str) -> AdaptiveLimiter:
+        key = (provider, api_key)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            self._evict_idle()
+            limiter = AdaptiveLimiter(
+                initial=settings.upstream_initial_concurrency,
+                minimum=settings.upstream_min_concurrency,
+                maximum=settings.upstream_max_concurrency,
+            )
+            self._limiters[key] = limiter
+        return limiter
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - settings.ai_client_idle_ttl_seconds
+        idle = [
+            key for key, limiter in self._limiters.items()
+            if not limiter.in_flight and not limiter.queued and limiter.last_used < cutoff
+        ]
+        for key in idle:
+            del self._limiters[key]
+
+    def _count(self, provider: str, name: str) -> None:
+        counters = self.counters.setdefault(provider, {"calls": 0, "retries": 0, "throttled": 0, "deadline_exceeded": 0})
+        counters[name] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(settings.upstream_backoff_max_seconds, settings.upstream_backoff_base_seconds * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def call(
+        self,
+        provider: str,
+        api_key: str,
+        request: Callable[[], Awaitable[Any]],
+        deadline: float | None = None,
+        retries: int | None = None,
+    ) -> Any:
+        """Run ``request`` under the provider's limits.
+
+        ``deadline`` defaults to ``upstream_deadline_seconds`` and ``retries`` to
+        ``upstream_max_retries``; pass ``retries=0`` for calls that are not safe
+        to repeat, such as ones that create a resource or bill per call.
+        """
+        with self.breaker(provider).guard():
+            return await self._call_with_retries(provider, api_key, request, deadline, retries)
+
+    async def _call_with_retries(
+        self,
+        provider: str,
+        api_key: str,
+        request: Callable[[], Awaitable[Any]],
+        deadline: float | None,
+        retries: int | None,
+    ) -> Any:
+        limiter = self._limiter(provider, api_key)
+        deadline_at = time.monotonic() + (deadline or settings.upstream_deadline_seconds)
+        max_retries = settings.upstream_max_retries if retries is None else retries
+        attempt = 0
+
+        while True:
+            remaining = deadline_at - time.monotonic()
+            try:
+                await limiter.acquire(remaining)
+            except asyncio.TimeoutError:
+                self._count(provider, "deadline_exceeded")
+                raise UpstreamQueueTimeoutException(service=provider)
+
+            self._count(provider, "calls")
+            succeeded = throttled = False
+            try:
+                result = await asyncio.wait_for(request(), deadline_at - time.monotonic())
+                succeeded = True
+                return result
+            except asyncio.TimeoutError:
+                self._count(provider, "deadline_exceeded")
+                raise UpstreamTimeoutException(service=provider)
+            except Exception as e:
+                throttled = _status_code(e) in THROTTLE_STATUS_CODES
+                if throttled:
+                    self._count(provider, "throttled")
+                if not is_retryable(e) or attempt >= max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if time.monotonic() + delay >= deadline_at:
+                    raise
+            finally:
+                await limiter.release(succeeded, throttled)
+
+            attempt += 1
+            self._count(provider, "retries")
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> dict:
+        providers: dict[str, dict] = {}
+        for (provider, _), limiter in self._limiters.items():
+            stats = providers.setdefault(provider, {"keys": 0, "in_flight": 0, "queued": 0, "concurrency_limit": 0})
+            stats["keys"] += 1
+            stats["in_flight"] += limiter.in_flight
+            stats["queued"] += limiter.queued
+            stats["concurrency_limit"] += int(limiter.limit)
+        for provider, counters in self.counters.items():
+            providers.setdefault(provider, {"keys": 0, "in_flight": 0, "queued": 0, "concurrency_limit": 0}).update(counters)
+        for provider, breaker in self.breakers.items():
+            providers.setdefault(provider, {"keys": 0, "in_flight": 0, "queued": 0, "concurrency_limit": 0})
+            providers[provider]["circuit"] = breaker.snapshot()
+        return providers
+
+
+upstream = UpstreamScheduler()
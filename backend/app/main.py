@@ -7,10 +7,14 @@ from slowapi.errors import RateLimitExceeded
 from app.core.config import get_settings
 from sqlalchemy import text
 from app.core.database import engine, Base
+from app.core.ai_clients import ai_clients
 from app.core.rate_limit import limiter
+from app.core.upstream import upstream
 from app.core.error_handlers import api_exception_handler, rate_limit_handler, general_exception_handler
 from app.core.exceptions import APIException
-from app.api.routes import campaign, image, seasonal
+from app.api.routes import campaign, image, job, seasonal
+from app.services.free_usage_accountant import accountant
+from app.services.job_service import worker_pool
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +34,8 @@ async def lifespan(app: FastAPI):
     print(f"Free tier enabled: {settings.free_tier_enabled}")
     print(f"Anthropic key set: {bool(settings.anthropic_api_key)}")
     print(f"OpenAI key set: {bool(settings.openai_api_key)}")
+    if settings.image_mirror_enabled and not settings.public_base_url:
+        logger.warning("PUBLIC_BASE_URL is not set; generated images will not be mirrored")
 
     try:
         async with engine.begin() as conn:
@@ -38,6 +44,14 @@ async def lifespan(app: FastAPI):
             await conn.execute(
                 text("ALTER TABLE campaigns ALTER COLUMN image_prompt DROP NOT NULL")
             )
+            # Migrate: keyset pagination index for existing campaigns tables
+            await conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_campaigns_created_at_id ON campaigns (created_at, id)")
+            )
+            # Migrate: image cache eviction looks campaigns up by image URL
+            await conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_campaigns_image_url ON campaigns (image_url)")
+            )
         print("Database tables created")
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
@@ -47,8 +61,15 @@ async def lifespan(app: FastAPI):
         )
         raise
 
+    if settings.free_tier_write_behind:
+        accountant.start()
+    await worker_pool.start()
+
     yield
 
+    await worker_pool.stop()
+    await accountant.stop()
+    await ai_clients.aclose()
     await engine.dispose()
     print("Shutting down application")
 
@@ -73,6 +94,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["Content-Type", "X-Anthropic-Key", "X-OpenAI-Key"],
+    expose_headers=["X-Cache", "X-Cache-Hits", "X-Cache-Misses"],
 )
 
 
@@ -93,6 +115,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics/upstream")
+async def upstream_metrics():
+    return upstream.metrics()
+
+
 app.include_router(campaign.router, prefix="/api/v1")
 app.include_router(image.router, prefix="/api/v1")
+app.include_router(job.router, prefix="/api/v1")
 app.include_router(seasonal.router, prefix="/api/v1")
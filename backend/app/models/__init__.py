@@ -1,4 +1,8 @@
 from app.models.campaign import Campaign
+from app.models.campaign_job import CampaignJob
+from app.models.copy_batch_job import CopyBatchJob
+from app.models.copy_cache import CopyCacheEntry
 from app.models.free_usage import FreeUsage
+from app.models.image_cache import ImageCacheEntry
 
-__all__ = ["Campaign", "FreeUsage"]
+__all__ = ["Campaign", "CampaignJob", "CopyBatchJob", "CopyCacheEntry", "FreeUsage", "ImageCacheEntry"]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Boolean, DateTime, JSON
+from sqlalchemy import String, Text, Boolean, DateTime, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
@@ -7,6 +7,10 @@ from app.core.database import Base
 
 class Campaign(Base):
     __tablename__ = "campaigns"
+    __table_args__ = (
+        Index("ix_campaigns_created_at_id", "created_at", "id"),
+        Index("ix_campaigns_image_url", "image_url"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
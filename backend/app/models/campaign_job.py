@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CampaignJob(Base):
+    __tablename__ = "campaign_jobs"
+    __table_args__ = (
+        Index("ix_campaign_jobs_owner_status_id", "owner", "status", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    # Worker process that holds the caller's API keys; only it can run the job.
+    owner: Mapped[str] = mapped_column(String(64), nullable=False)
+    # SHA-256 of the caller's Anthropic key; the job is only shown to that key.
+    api_key_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    brief: Mapped[dict] = mapped_column(JSON, nullable=False)
+    save: Mapped[bool] = mapped_column(Boolean, default=True)
+    image_cache: Mapped[str] = mapped_column(String(20), nullable=False, default="default")
+    webhook_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    campaign_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Boolean, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CopyBatchJob(Base):
+    __tablename__ = "copy_batch_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    anthropic_batch_id: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    # SHA-256 of the submitting key; the job is only shown to callers using the same key.
+    api_key_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="in_progress", index=True)
+    include_image_prompt: Mapped[bool] = mapped_column(Boolean, default=True)
+    save: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    briefs: Mapped[list] = mapped_column(JSON, nullable=False)
+    results: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    succeeded_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    errored_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
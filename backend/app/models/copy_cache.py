@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CopyCacheEntry(Base):
+    __tablename__ = "copy_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    response: Mapped[dict] = mapped_column(JSON, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Annotated, Literal
 from pydantic import BaseModel, Field
 
 
@@ -40,18 +41,38 @@ class CampaignBrief(BaseModel):
     seasonal_hook: str | None = Field(default=None, max_length=200)
 
 
-class PlatformCopy(BaseModel):
-    platform: str
-    content: str
+class BatchGenerationRequest(BaseModel):
+    briefs: list[CampaignBrief] = Field(..., min_length=1)
+    save: bool = Field(default=True)
+
+
+class CopyBatchJobRequest(BaseModel):
+    briefs: list[CampaignBrief] = Field(..., min_length=1)
+    include_image_prompt: bool = Field(default=True)
+    save: bool = Field(default=True)
+
+
+class GeneratedCopy(BaseModel):
+    platform: str = Field(..., description="Platform name exactly as given in the brief")
+    content: str = Field(..., description="The complete copy, ready to post")
+
+
+class PlatformCopy(GeneratedCopy):
     character_count: int
 
 
+class CopyToolOutput(BaseModel):
+    copies: list[GeneratedCopy]
+    image_prompt: str | None = None
+
+
 class CopyGenerationResponse(BaseModel):
     success: bool = Field(default=True)
     business_name: str
     copies: list[PlatformCopy]
     image_prompt: str | None = None
     message: str | None = None
+    usage: dict[str, int] | None = None
 
 
 class ErrorResponse(BaseModel):
@@ -83,8 +104,48 @@ class CampaignRecord(BaseModel):
 
 class CampaignListResponse(BaseModel):
     success: bool = True
+    view: Literal["full"] = "full"
     campaigns: list[CampaignRecord]
-    total: int
+    total: int | None
+    next_cursor: str | None = None
+
+
+class CampaignSummary(BaseModel):
+    id: int
+    business_name: str
+    business_type: str
+    created_at: datetime
+    platforms: list[str]
+    image_url: str | None
+    preview: str | None
+
+    class Config:
+        from_attributes = True
+
+
+class CampaignSummaryListResponse(BaseModel):
+    success: bool = True
+    view: Literal["summary"] = "summary"
+    campaigns: list[CampaignSummary]
+    total: int | None
+    next_cursor: str | None = None
+
+
+# The discriminator lets response validation go straight to the right model
+# instead of first failing every summary row against CampaignRecord.
+CampaignListView = Annotated[CampaignListResponse | CampaignSummaryListResponse, Field(discriminator="view")]
+
+
+class CopyBatchJobResponse(BaseModel):
+    success: bool = True
+    job_id: int
+    status: str
+    request_count: int
+    succeeded_count: int
+    errored_count: int
+    results: list[dict] | None = None
+    created_at: datetime
+    completed_at: datetime | None = None
 
 
 class FreeTierStatusResponse(BaseModel):
@@ -30,3 +30,4 @@ class CampaignFullResponse(BaseModel):
     image_url: str | None = Field(default=None, description="Generated image URL")
     revised_image_prompt: str | None = Field(default=None)
     message: str | None = None
+    timings: dict[str, float] | None = Field(default=None, description="Per-stage durations in milliseconds")
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from pydantic import AnyHttpUrl, BaseModel, Field
+
+from app.schemas.campaign import CampaignBrief
+from app.schemas.image import CampaignFullResponse
+
+
+class CampaignJobRequest(BaseModel):
+    brief: CampaignBrief
+    save: bool = Field(default=True, description="Save campaign to database")
+    image_cache: str = Field(
+        default="default",
+        pattern="^(default|refresh|bypass)$",
+        description="Image cache for identical prompts: 'default', 'refresh' or 'bypass'",
+    )
+    webhook_url: AnyHttpUrl | None = Field(
+        default=None,
+        description="URL that receives the finished job as a JSON POST",
+    )
+
+
+class CampaignJobResponse(BaseModel):
+    success: bool = True
+    job_id: int
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    campaign_id: int | None = None
+    result: CampaignFullResponse | None = None
+    error: dict | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import weakref
+from collections.abc import AsyncIterator
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import APIException
+from app.schemas.campaign import CampaignBrief, CopyGenerationResponse
+from app.services import campaign_service
+from app.services.claude_service import generate_copy
+
+
+settings = get_settings()
+
+_global_slots = asyncio.Semaphore(settings.batch_max_concurrency)
+# Per-key semaphores disappear once no running batch holds a reference.
+_key_slots: weakref.WeakValueDictionary[str, asyncio.Semaphore] = weakref.WeakValueDictionary()
+
+
+def _slots_for_key(api_key: str) -> asyncio.Semaphore:
+    slots = _key_slots.get(api_key)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.batch_max_concurrency_per_key)
+        _key_slots[api_key] = slots
+    return slots
+
+
+async def _generate_one(
+    index: int,
+    brief: CampaignBrief,
+    api_key: str,
+    key_slots: asyncio.Semaphore,
+) -> tuple[int, CopyGenerationResponse | None, dict | None]:
+    async with key_slots, _global_slots:
+        try:
+            return index, await generate_copy(brief, api_key), None
+        except APIException as e:
+            return index, None, e.detail
+        except Exception:
+            return index, None, {"success": False, "error": "generation_failed", "detail": "Copy generation failed"}
+
+
+def _ndjson(data: dict) -> str:
+    return json.dumps(data) + "\n"
+
+
+async def stream_batch(
+    briefs: list[CampaignBrief],
+    api_key: str,
+    save: bool = True,
+) -> AsyncIterator[str]:
+    """Generate copy for each brief, yielding NDJSON lines in completion order.
+
+    Successful results are saved with a single bulk insert once all briefs finish.
+    """
+    key_slots = _slots_for_key(api_key)
+    tasks = [
+        asyncio.create_task(_generate_one(index, brief, api_key, key_slots))
+        for index, brief in enumerate(briefs)
+    ]
+    completed = []
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, result, error = await next_done
+            if result is None:
+                yield _ndjson({"index": index, **error})
+                continue
+            completed.append((briefs[index], result))
+            yield _ndjson({"index": index, **result.model_dump()})
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    saved = 0
+    if save and completed:
+        async with AsyncSessionLocal() as db:
+            saved = len(await campaign_service.save_campaigns(db, completed))
+
+    yield _ndjson({
+        "done": True,
+        "succeeded": len(completed),
+        "failed": len(briefs) - len(completed),
+        "saved": saved,
+    })
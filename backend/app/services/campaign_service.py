@@ -1,19 +1,24 @@
+import base64
+from collections.abc import AsyncIterator
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, text, tuple_, update
 from sqlalchemy.sql import func
 
+from app.core.cache import TTLCache
+from app.core.exceptions import BadRequestException
 from app.models.campaign import Campaign
-from app.schemas.campaign import CampaignBrief, PlatformCopy
+from app.schemas.campaign import CampaignBrief, CopyGenerationResponse, PlatformCopy
 
 
-async def save_campaign(
-    db: AsyncSession,
+def _build_campaign(
     brief: CampaignBrief,
     copies: list[PlatformCopy],
     image_prompt: str | None = None,
     image_url: str | None = None,
 ) -> Campaign:
-    campaign = Campaign(
+    return Campaign(
         business_name=brief.business_name,
         business_type=brief.business_type,
         target_audience=brief.target_audience,
@@ -29,6 +34,16 @@ async def save_campaign(
         image_url=image_url,
     )
 
+
+async def save_campaign(
+    db: AsyncSession,
+    brief: CampaignBrief,
+    copies: list[PlatformCopy],
+    image_prompt: str | None = None,
+    image_url: str | None = None,
+) -> Campaign:
+    campaign = _build_campaign(brief, copies, image_prompt, image_url)
+
     db.add(campaign)
     await db.commit()
     await db.refresh(campaign)
@@ -36,28 +51,159 @@ async def save_campaign(
     return campaign
 
 
-async def get_campaigns(
+async def save_campaigns(
     db: AsyncSession,
-    skip: int = 0,
-    limit: int = 10,
-) -> tuple[list[Campaign], int]:
+    results: list[tuple[CampaignBrief, CopyGenerationResponse]],
+) -> list[Campaign]:
+    campaigns = [
+        _build_campaign(brief, result.copies, result.image_prompt)
+        for brief, result in results
+    ]
+
+    db.add_all(campaigns)
+    await db.commit()
+
+    return campaigns
+
+
+TOTAL_MODES = ("exact", "cached", "estimate", "none")
+PREVIEW_LENGTH = 160
+
+_total_cache = TTLCache(max_entries=1, ttl=60)
+
+
+def encode_cursor(campaign: Campaign) -> str:
+    raw = f"{campaign.created_at.isoformat()}|{campaign.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, campaign_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(campaign_id)
+    except ValueError:
+        raise BadRequestException(
+            error="invalid_cursor",
+            detail="The pagination cursor is malformed. Use the next_cursor value from a previous response.",
+        )
+
+
+async def count_campaigns(db: AsyncSession, mode: str = "exact") -> int | None:
+    if mode == "none":
+        return None
+
+    if mode == "estimate":
+        # Planner statistics: free to read, refreshed by autovacuum/ANALYZE.
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'campaigns'::regclass")
+        )
+        estimate = result.scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+        mode = "cached"
+
+    if mode == "cached":
+        total = _total_cache.get("campaigns")
+        if total is not None:
+            return total
+
     count_query = select(func.count()).select_from(Campaign)
     count_result = await db.execute(count_query)
     total = count_result.scalar()
+    _total_cache.set("campaigns", total)
+    return total
+
+
+async def _paginate(
+    db: AsyncSession,
+    query,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+    scalars: bool = True,
+) -> tuple[list, str | None]:
+    query = query.order_by(desc(Campaign.created_at), desc(Campaign.id))
+    if cursor:
+        created_at, campaign_id = decode_cursor(cursor)
+        query = query.where(tuple_(Campaign.created_at, Campaign.id) < (created_at, campaign_id))
+    else:
+        query = query.offset(skip)
+
+    # Fetch one extra row to learn whether another page exists.
+    result = await db.execute(query.limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
 
-    query = (
-        select(Campaign)
-        .order_by(desc(Campaign.created_at))
-        .offset(skip)
-        .limit(limit)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+
+    return rows, next_cursor
+
+
+async def get_campaigns(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    total_mode: str = "exact",
+) -> tuple[list[Campaign], int | None, str | None]:
+    total = await count_campaigns(db, total_mode)
+    campaigns, next_cursor = await _paginate(db, select(Campaign), skip, limit, cursor)
+    return campaigns, total, next_cursor
+
+
+async def get_campaign_summaries(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    total_mode: str = "exact",
+) -> tuple[list, int | None, str | None]:
+    total = await count_campaigns(db, total_mode)
+    query = select(
+        Campaign.id,
+        Campaign.business_name,
+        Campaign.business_type,
+        Campaign.created_at,
+        Campaign.platforms,
+        Campaign.image_url,
+        func.left(Campaign.generated_copies[0]["content"].as_string(), PREVIEW_LENGTH).label("preview"),
     )
-    result = await db.execute(query)
-    campaigns = result.scalars().all()
+    rows, next_cursor = await _paginate(db, query, skip, limit, cursor, scalars=False)
+    return rows, total, next_cursor
 
-    return list(campaigns), total
+
+async def stream_campaign_batches(
+    db: AsyncSession,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[list[Campaign]]:
+    """Yield campaigns oldest first, ``batch_size`` rows at a time, from a server-side cursor.
+
+    ``since`` is inclusive and ``until`` exclusive.
+    """
+    query = select(Campaign).order_by(Campaign.created_at, Campaign.id)
+    if since is not None:
+        query = query.where(Campaign.created_at >= since)
+    if until is not None:
+        query = query.where(Campaign.created_at < until)
+
+    result = await db.stream_scalars(query.execution_options(yield_per=batch_size))
+    async for batch in result.partitions():
+        yield batch
+        # Drop exported rows from the session so memory stays flat.
+        for campaign in batch:
+            db.expunge(campaign)
 
 
 async def get_campaign_by_id(db: AsyncSession, campaign_id: int) -> Campaign | None:
     query = select(Campaign).where(Campaign.id == campaign_id)
     result = await db.execute(query)
     return result.scalar_one_or_none()
+
+
+async def update_image_url(db: AsyncSession, campaign_id: int, image_url: str) -> None:
+    await db.execute(update(Campaign).where(Campaign.id == campaign_id).values(image_url=image_url))
+    await db.commit()
@@ -1,9 +1,24 @@
-import anthropic
+from collections.abc import AsyncIterator
+
 from anthropic import APIError, APIConnectionError, AuthenticationError, RateLimitError
+from pydantic import ValidationError
 
+from app.core.ai_clients import ai_clients
+from app.core.config import get_settings
+from app.core.single_flight import SingleFlight, make_flight_key
+from app.core.upstream import upstream
 from app.core.exceptions import AIServiceException, APIException
-from app.schemas.campaign import CampaignBrief, PlatformCopy, CopyGenerationResponse
+from app.schemas.campaign import (
+    CampaignBrief,
+    CopyGenerationResponse,
+    CopyToolOutput,
+    GeneratedCopy,
+    PlatformCopy,
+)
+from app.services.copy_parser import CopyResponseParser
+
 
+settings = get_settings()
 
 PLATFORM_LIMITS = {
     "Instagram": 2200,
@@ -14,161 +29,430 @@ PLATFORM_LIMITS = {
 }
 
 
-def get_platform_limit(platform: str) -> int:
-    return PLATFORM_LIMITS.get(platform, 500)
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+# Bump whenever build_copy_prompt changes so cached generations are invalidated.
+PROMPT_TEMPLATE_VERSION = 2
 
+COPY_TOOL_NAME = "submit_campaign_copy"
 
-def build_copy_prompt(brief: CampaignBrief, include_image_prompt: bool = True) -> str:
-    platforms_info = "\n".join(
-        f"- {p}: Maximum {get_platform_limit(p)} characters"
-        for p in brief.platforms
-    )
+copy_flights = SingleFlight()
 
-    seasonal_section = ""
-    if brief.seasonal_hook:
-        seasonal_section = f"""
-Seasonal/Event Hook: {brief.seasonal_hook}
-- Incorporate this seasonal element naturally into the copy
-- Reference relevant UK cultural context if applicable
-"""
 
-    prompt = f"""You are an expert UK social media marketing copywriter. Generate engaging social media copy for a British small business.
+def get_platform_limit(platform: str) -> int:
+    return PLATFORM_LIMITS.get(platform, 500)
 
-IMPORTANT: You MUST write in British English. Use British spelling (colour, favourite, organise, centre, theatre, behaviour, programme, travelled, catalogue, defence, licence, practise, cheque, grey, tyre, aluminium, jewellery, mum, whilst, amongst).
 
-## Business Details
-- Business Name: {brief.business_name}
-- Business Type: {brief.business_type}
-- Target Audience: {brief.target_audience}
+# The instructions below are identical for every request. They are assembled
+# once at import time and sent as a separate system block marked for caching.
+# Anthropic only caches prefixes above a model minimum (1024 tokens for
+# Sonnet), which these instructions do not reach yet; the cache applies on
+# its own once the real instructions grow past it.
+_INSTRUCTIONS = """You are an expert UK social media marketing copywriter. Generate engaging social media copy for a British small business.
 
-## Campaign Information
-- Campaign Goal: {brief.campaign_goal}
-- Key Messages: {brief.key_messages}
-- Desired Tone: {brief.tone}
-{seasonal_section}
+IMPORTANT: You MUST write in British English. Use British spelling (colour, favourite, organise, centre, theatre, behaviour, programme, travelled, catalogue, defence, licence, practise, cheque, grey, tyre, aluminium, jewellery, mum, whilst, amongst).
 
-## Content Requirements
-- Include hashtags: {"Yes - add relevant UK-focused hashtags" if brief.include_hashtags else "No"}
-- Include emojis: {"Yes - use sparingly and appropriately" if brief.include_emoji else "No"}
-
-## Platforms and Limits
-Generate copy for each platform, respecting character limits:
-{platforms_info}
+The user will send a campaign brief with business details, campaign information, content requirements and the platforms to write for, each with a character limit that must be respected.
 
 ## Output Format
 For each platform, provide:
 1. The platform name
 2. The complete copy (ready to post)
 3. Ensure British spelling throughout
-{"" if not include_image_prompt else """
+"""
+
+_IMAGE_INSTRUCTIONS = """
 Also provide a DALL-E image prompt that would create an appropriate promotional image for this campaign. The prompt should:
 - Describe a professional marketing image
 - Match the brand tone
 - Be suitable for UK audiences
 - NOT include any text in the image (text will be added separately)
-"""}
+"""
+
+_FORMAT = """
 Respond in this exact format for each platform:
 
 [PLATFORM: platform_name]
 [COPY]
 Your generated copy here...
 [/COPY]
-{"" if not include_image_prompt else """
+"""
+
+_IMAGE_FORMAT = """
 [IMAGE_PROMPT]
 Your DALL-E prompt here...
 [/IMAGE_PROMPT]
-"""}"""
-    return prompt
+"""
+
+
+_TOOL_FORMAT = f"""
+Return the result by calling the {COPY_TOOL_NAME} tool, with one entry in copies per platform.
+"""
+
+_TOOL_IMAGE_FORMAT = """Put the DALL-E prompt in image_prompt.
+"""
+
+
+def _cached_system_block(text: str) -> list[dict]:
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+SYSTEM_PROMPTS = {
+    ("markers", False): _cached_system_block(_INSTRUCTIONS + _FORMAT),
+    ("markers", True): _cached_system_block(_INSTRUCTIONS + _IMAGE_INSTRUCTIONS + _FORMAT + _IMAGE_FORMAT),
+    ("tool", False): _cached_system_block(_INSTRUCTIONS + _TOOL_FORMAT),
+    ("tool", True): _cached_system_block(_INSTRUCTIONS + _IMAGE_INSTRUCTIONS + _TOOL_FORMAT + _TOOL_IMAGE_FORMAT),
+}
+
+COPY_TOOL = {
+    "name": COPY_TOOL_NAME,
+    "description": "Submit the generated social media copy for each requested platform.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "copies": {"type": "array", "items": GeneratedCopy.model_json_schema()},
+            "image_prompt": {"type": "string", "description": "DALL-E prompt for the campaign image, if requested"},
+        },
+        "required": ["copies"],
+    },
+}
+
+BRIEF_TEMPLATE = """## Business Details
+- Business Name: {business_name}
+- Business Type: {business_type}
+- Target Audience: {target_audience}
+
+## Campaign Information
+- Campaign Goal: {campaign_goal}
+- Key Messages: {key_messages}
+- Desired Tone: {tone}
+{seasonal_section}
+## Content Requirements
+- Include hashtags: {hashtags}
+- Include emojis: {emojis}
+
+## Platforms and Limits
+Generate copy for each platform, respecting character limits:
+{platforms_info}
+"""
+
+SHORTEN_TEMPLATE = """The following British English social media copies are longer than their platform's character limit.
+
+Rewrite each one so it fits within its limit. Keep the message, tone, British spelling, hashtags and emojis where space allows.
+
+{copies}
+
+Respond in this exact format for each platform:
+
+[PLATFORM: platform_name]
+[COPY]
+Your shortened copy here...
+[/COPY]
+"""
+
+SEASONAL_TEMPLATE = """
+Seasonal/Event Hook: {seasonal_hook}
+- Incorporate this seasonal element naturally into the copy
+- Reference relevant UK cultural context if applicable
+"""
+
+
+def build_copy_prompt(brief: CampaignBrief, include_image_prompt: bool = True) -> str:
+    """Render the per-request brief; the static instructions live in the system prompt."""
+    platforms_info = "\n".join(
+        f"- {p}: Maximum {get_platform_limit(p)} characters"
+        for p in brief.platforms
+    )
+    seasonal_section = SEASONAL_TEMPLATE.format(seasonal_hook=brief.seasonal_hook) if brief.seasonal_hook else ""
+
+    return BRIEF_TEMPLATE.format(
+        business_name=brief.business_name,
+        business_type=brief.business_type,
+        target_audience=brief.target_audience,
+        campaign_goal=brief.campaign_goal,
+        key_messages=brief.key_messages,
+        tone=brief.tone,
+        seasonal_section=seasonal_section,
+        hashtags="Yes - add relevant UK-focused hashtags" if brief.include_hashtags else "No",
+        emojis="Yes - use sparingly and appropriately" if brief.include_emoji else "No",
+        platforms_info=platforms_info,
+    )
+
+
+def get_system_prompt(include_image_prompt: bool = True, output_mode: str = "markers") -> list[dict]:
+    return SYSTEM_PROMPTS[(output_mode, include_image_prompt)]
+
+
+def build_shorten_prompt(copies: list[PlatformCopy]) -> str:
+    blocks = "\n\n".join(
+        f"[PLATFORM: {c.platform}]\n"
+        f"Limit: {get_platform_limit(c.platform)} characters (currently {c.character_count})\n"
+        f"[COPY]\n{c.content}\n[/COPY]"
+        for c in copies
+    )
+    return SHORTEN_TEMPLATE.format(copies=blocks)
+
+
+def find_over_limit(copies: list[PlatformCopy]) -> list[PlatformCopy]:
+    return [c for c in copies if c.character_count > get_platform_limit(c.platform)]
+
+
+def truncate_to_limit(copy: PlatformCopy) -> PlatformCopy:
+    limit = get_platform_limit(copy.platform)
+    if copy.character_count <= limit:
+        return copy
+    cut = copy.content[:limit - 1]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    content = cut.rstrip() + "…"
+    return PlatformCopy(platform=copy.platform, content=content, character_count=len(content))
+
+
+def build_brief_image_prompt(brief: CampaignBrief) -> str:
+    prompt = f"Professional marketing photograph for {brief.business_type}, {brief.tone} style"
+    if brief.seasonal_hook:
+        prompt += f", {brief.seasonal_hook} theme"
+    return f"{prompt}, suitable for UK audience, no text"
 
 
 def parse_claude_response(response_text: str, platforms: list[str]) -> tuple[list[PlatformCopy], str]:
-    copies = []
-    image_prompt = ""
-
-    if "[IMAGE_PROMPT]" in response_text:
-        start = response_text.find("[IMAGE_PROMPT]") + len("[IMAGE_PROMPT]")
-        end = response_text.find("[/IMAGE_PROMPT]")
-        if end > start:
-            image_prompt = response_text[start:end].strip()
-
-    for platform in platforms:
-        marker = f"[PLATFORM: {platform}]"
-        if marker in response_text:
-            start = response_text.find(marker)
-            copy_start = response_text.find("[COPY]", start) + len("[COPY]")
-            copy_end = response_text.find("[/COPY]", start)
-
-            if copy_start > len("[COPY]") - 1 and copy_end > copy_start:
-                copy_text = response_text[copy_start:copy_end].strip()
-                copies.append(
-                    PlatformCopy(
-                        platform=platform,
-                        content=copy_text,
-                        character_count=len(copy_text),
-                    )
-                )
-
-    return copies, image_prompt
-
-
-async def generate_copy(brief: CampaignBrief, api_key: str, include_image_prompt: bool = True) -> CopyGenerationResponse:
-    client = anthropic.AsyncAnthropic(api_key=api_key)
-    prompt = build_copy_prompt(brief, include_image_prompt=include_image_prompt)
+    parser = CopyResponseParser(platforms)
+    copies = parser.feed(response_text) + parser.finish()
+    order = {platform: index for index, platform in enumerate(platforms)}
+    copies.sort(key=lambda c: order[c.platform])
+    return copies, parser.image_prompt
+
+
+def build_copy_request(prompt: str, include_image_prompt: bool = True, output_mode: str = "markers") -> dict:
+    request = {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 2048,
+        "system": get_system_prompt(include_image_prompt, output_mode),
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ],
+    }
+    if output_mode == "tool":
+        request["tools"] = [COPY_TOOL]
+        request["tool_choice"] = {"type": "tool", "name": COPY_TOOL_NAME}
+    return request
+
+
+def build_fallback_copy(brief: CampaignBrief, response_text: str) -> PlatformCopy:
+    return PlatformCopy(
+        platform=brief.platforms[0] if brief.platforms else "General",
+        content=response_text[:500],
+        character_count=min(len(response_text), 500),
+    )
+
+
+def build_usage(usage) -> dict[str, int]:
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_creation_input_tokens": usage.cache_creation_input_tokens or 0,
+        "cache_read_input_tokens": usage.cache_read_input_tokens or 0,
+    }
 
+
+def build_copy_response(
+    brief: CampaignBrief,
+    response_text: str,
+    include_image_prompt: bool = True,
+    usage=None,
+) -> CopyGenerationResponse:
+    copies, image_prompt = parse_claude_response(response_text, brief.platforms)
+    return _finalise_copy_response(brief, copies, image_prompt, response_text, include_image_prompt, usage)
+
+
+def build_tool_copy_response(
+    brief: CampaignBrief,
+    message,
+    include_image_prompt: bool = True,
+) -> CopyGenerationResponse:
+    response_text = "".join(block.text for block in message.content if block.type == "text")
+    tool_input = next(
+        (block.input for block in message.content if block.type == "tool_use" and block.name == COPY_TOOL_NAME),
+        None,
+    )
     try:
-        message = await client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2048,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-        )
+        output = CopyToolOutput.model_validate(tool_input)
+    except ValidationError:
+        # Fall back to the marker format in case Claude answered in text.
+        return build_copy_response(brief, response_text, include_image_prompt, message.usage)
 
-        response_text = message.content[0].text
-        copies, image_prompt = parse_claude_response(response_text, brief.platforms)
-
-        if not copies:
-            copies = [
-                PlatformCopy(
-                    platform=brief.platforms[0] if brief.platforms else "General",
-                    content=response_text[:500],
-                    character_count=min(len(response_text), 500),
-                )
-            ]
-
-        if include_image_prompt and not image_prompt:
-            image_prompt = f"Professional marketing photograph for {brief.business_type}, {brief.tone} style, suitable for UK audience, no text"
-
-        return CopyGenerationResponse(
-            success=True,
-            business_name=brief.business_name,
-            copies=copies,
-            image_prompt=image_prompt if include_image_prompt else None,
-            message="Copy generated successfully using British English",
-        )
+    platform_names = {p.strip().lower(): p for p in brief.platforms}
+    copies = []
+    for item in output.copies:
+        platform = platform_names.get(item.platform.strip().lower())
+        content = item.content.strip()
+        if platform is None or not content or any(c.platform == platform for c in copies):
+            continue
+        copies.append(PlatformCopy(platform=platform, content=content, character_count=len(content)))
 
-    except AuthenticationError:
-        raise APIException(
+    return _finalise_copy_response(
+        brief, copies, output.image_prompt or "", response_text, include_image_prompt, message.usage
+    )
+
+
+def _finalise_copy_response(
+    brief: CampaignBrief,
+    copies: list[PlatformCopy],
+    image_prompt: str,
+    response_text: str,
+    include_image_prompt: bool,
+    usage,
+) -> CopyGenerationResponse:
+    if not copies:
+        copies = [build_fallback_copy(brief, response_text)]
+
+    if include_image_prompt and not image_prompt:
+        image_prompt = build_brief_image_prompt(brief)
+
+    return CopyGenerationResponse(
+        success=True,
+        business_name=brief.business_name,
+        copies=copies,
+        image_prompt=image_prompt if include_image_prompt else None,
+        message="Copy generated successfully using British English",
+        usage=build_usage(usage) if usage else None,
+    )
+
+
+def map_anthropic_error(error: APIError) -> APIException:
+    if isinstance(error, AuthenticationError):
+        return APIException(
             status_code=401,
             error="invalid_api_key",
             detail="Your Anthropic API key is invalid or has been revoked. Please check your key and try again.",
             service="anthropic",
         )
-    except RateLimitError:
-        raise AIServiceException(
+    if isinstance(error, RateLimitError):
+        return AIServiceException(
             service="Claude",
             detail="Anthropic rate limit exceeded. Please wait a moment and try again.",
         )
-    except APIConnectionError:
-        raise AIServiceException(
+    if isinstance(error, APIConnectionError):
+        return AIServiceException(
             service="Claude",
             detail="Could not connect to Claude API. Please check your internet connection and try again.",
         )
-    except APIError as e:
-        raise AIServiceException(
-            service="Claude",
-            detail=f"Claude API error: {str(e)}",
+    return AIServiceException(
+        service="Claude",
+        detail=f"Claude API error: {str(error)}",
+    )
+
+
+async def generate_copy(
+    brief: CampaignBrief,
+    api_key: str,
+    include_image_prompt: bool = True,
+    output_mode: str | None = None,
+) -> CopyGenerationResponse:
+    output_mode = output_mode or settings.copy_output_mode
+    prompt = build_copy_prompt(brief, include_image_prompt=include_image_prompt)
+    # Identical concurrent briefs (retries, duplicate tabs) share one upstream call.
+    result = await copy_flights.do(
+        make_flight_key(api_key, include_image_prompt, output_mode, prompt),
+        lambda: _request_copy(brief, api_key, prompt, include_image_prompt, output_mode),
+    )
+    return result.model_copy(deep=True)
+
+
+async def _request_copy(
+    brief: CampaignBrief,
+    api_key: str,
+    prompt: str,
+    include_image_prompt: bool,
+    output_mode: str,
+) -> CopyGenerationResponse:
+    client = ai_clients.get_anthropic(api_key)
+
+    try:
+        request = build_copy_request(prompt, include_image_prompt, output_mode)
+        message = await upstream.call(
+            "anthropic",
+            api_key,
+            lambda: client.messages.create(**request),
+            deadline=settings.upstream_generation_deadline_seconds,
         )
+        if output_mode == "tool":
+            response = build_tool_copy_response(brief, message, include_image_prompt)
+        else:
+            response = build_copy_response(brief, message.content[0].text, include_image_prompt, message.usage)
+        return await enforce_platform_limits(client, api_key, response)
+
+    except APIError as e:
+        raise map_anthropic_error(e)
+
+
+async def enforce_platform_limits(client, api_key: str, response: CopyGenerationResponse) -> CopyGenerationResponse:
+    """Re-request only the copies that exceed their platform limit.
+
+    Up to ``copy_limit_retries`` small follow-up calls are made; anything still
+    too long afterwards is trimmed at a word boundary.
+    """
+    for _ in range(settings.copy_limit_retries):
+        over_limit = find_over_limit(response.copies)
+        if not over_limit:
+            break
+        try:
+            message = await upstream.call("anthropic", api_key, lambda: client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=1024,
+                messages=[{"role": "user", "content": build_shorten_prompt(over_limit)}],
+            ), deadline=settings.upstream_generation_deadline_seconds)
+        except (APIError, APIException):
+            break
+
+        rewritten, _ = parse_claude_response(message.content[0].text, [c.platform for c in over_limit])
+        shorter = {c.platform: c for c in rewritten}
+        response.copies = [
+            shorter[c.platform] if c.platform in shorter and shorter[c.platform].character_count < c.character_count else c
+            for c in response.copies
+        ]
+        if response.usage:
+            for key, value in build_usage(message.usage).items():
+                response.usage[key] += value
+
+    response.copies = [truncate_to_limit(c) for c in response.copies]
+    return response
+
+
+async def stream_copy(
+    brief: CampaignBrief,
+    api_key: str,
+    include_image_prompt: bool = True,
+) -> AsyncIterator[tuple[str, dict]]:
+    client = ai_clients.get_anthropic(api_key)
+    prompt = build_copy_prompt(brief, include_image_prompt=include_image_prompt)
+    parser = CopyResponseParser(brief.platforms)
+    emitted = 0
+
+    try:
+        with upstream.breaker("anthropic").guard():
+            async with client.messages.stream(**build_copy_request(prompt, include_image_prompt)) as stream:
+                async for text in stream.text_stream:
+                    for copy in parser.feed(text):
+                        emitted += 1
+                        yield "copy", copy.model_dump()
+                for copy in parser.finish():
+                    emitted += 1
+                    yield "copy", copy.model_dump()
+                final_message = await stream.get_final_message()
+    except APIError as e:
+        raise map_anthropic_error(e)
+
+    if not emitted:
+        yield "copy", build_fallback_copy(brief, parser.text).model_dump()
+
+    if include_image_prompt:
+        yield "image_prompt", {"image_prompt": parser.image_prompt or build_brief_image_prompt(brief)}
+
+    yield "done", {
+        "business_name": brief.business_name,
+        "message": "Copy generated successfully using British English",
+        "usage": build_usage(final_message.usage),
+    }
@@ -0,0 +1,137 @@
+from datetime import datetime
+
+from anthropic import APIError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai_clients import ai_clients
+from app.core.dependencies import api_key_matches, hash_api_key
+from app.core.upstream import upstream
+from app.models.copy_batch_job import CopyBatchJob
+from app.schemas.campaign import CampaignBrief
+from app.services import campaign_service
+from app.services.claude_service import (
+    build_copy_prompt,
+    build_copy_request,
+    build_copy_response,
+    map_anthropic_error,
+)
+
+
+async def submit_job(
+    db: AsyncSession,
+    briefs: list[CampaignBrief],
+    api_key: str,
+    include_image_prompt: bool = True,
+    save: bool = True,
+) -> CopyBatchJob:
+    """Send every brief to the Anthropic Message Batches API as one batch."""
+    client = ai_clients.get_anthropic(api_key)
+    requests = [
+        {
+            "custom_id": str(index),
+            "params": build_copy_request(
+                build_copy_prompt(brief, include_image_prompt=include_image_prompt),
+                include_image_prompt,
+            ),
+        }
+        for index, brief in enumerate(briefs)
+    ]
+
+    try:
+        # Not retried: a lost response would otherwise submit (and bill) the batch twice.
+        batch = await upstream.call(
+            "anthropic",
+            api_key,
+            lambda: client.messages.batches.create(requests=requests),
+            retries=0,
+        )
+    except APIError as e:
+        raise map_anthropic_error(e)
+
+    job = CopyBatchJob(
+        anthropic_batch_id=batch.id,
+        api_key_hash=hash_api_key(api_key),
+        status=batch.processing_status,
+        include_image_prompt=include_image_prompt,
+        save=save,
+        briefs=[brief.model_dump() for brief in briefs],
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: int, api_key: str) -> CopyBatchJob | None:
+    """The job, if it exists and was submitted with ``api_key``."""
+    query = select(CopyBatchJob).where(CopyBatchJob.id == job_id)
+    result = await db.execute(query)
+    job = result.scalar_one_or_none()
+    if job is None or not api_key_matches(job.api_key_hash, api_key):
+        return None
+    return job
+
+
+async def refresh_job(db: AsyncSession, job: CopyBatchJob, api_key: str) -> CopyBatchJob:
+    """Poll the batch and, once it has ended, parse and store all results."""
+    if job.completed_at is not None:
+        return job
+
+    client = ai_clients.get_anthropic(api_key)
+    try:
+        batch = await upstream.call(
+            "anthropic", api_key, lambda: client.messages.batches.retrieve(job.anthropic_batch_id)
+        )
+        if batch.processing_status != "ended":
+            job.status = batch.processing_status
+            await db.commit()
+            return job
+        results = await client.messages.batches.results(job.anthropic_batch_id)
+        entries = [entry async for entry in results]
+    except APIError as e:
+        raise map_anthropic_error(e)
+
+    # Concurrent polls can all see the batch end; only the first to lock the
+    # row stores the results, so campaigns are not saved twice.
+    locked = await db.execute(
+        select(CopyBatchJob)
+        .where(CopyBatchJob.id == job.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    job = locked.scalar_one()
+    if job.completed_at is not None:
+        await db.commit()
+        return job
+
+    briefs = [CampaignBrief.model_validate(brief) for brief in job.briefs]
+    parsed = []
+    generated = []
+    for entry in sorted(entries, key=lambda e: int(e.custom_id)):
+        index = int(entry.custom_id)
+        if entry.result.type != "succeeded":
+            parsed.append({"index": index, "success": False, "error": entry.result.type})
+            continue
+        response = build_copy_response(
+            briefs[index],
+            entry.result.message.content[0].text,
+            job.include_image_prompt,
+            entry.result.message.usage,
+        )
+        generated.append((briefs[index], response))
+        parsed.append({"index": index, **response.model_dump()})
+
+    job.status = "ended"
+    job.results = parsed
+    job.succeeded_count = len(generated)
+    job.errored_count = len(parsed) - len(generated)
+    job.completed_at = datetime.utcnow()
+
+    if job.save and generated:
+        # Commits the job update together with the campaigns.
+        await campaign_service.save_campaigns(db, generated)
+    else:
+        await db.commit()
+    return job
+
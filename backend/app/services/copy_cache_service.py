@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.dependencies import hash_api_key
+from app.models.copy_cache import CopyCacheEntry
+from app.schemas.campaign import CampaignBrief, CopyGenerationResponse
+from app.services.claude_service import CLAUDE_MODEL, PROMPT_TEMPLATE_VERSION, generate_copy
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CACHE_MODES = ("default", "bypass", "refresh")
+
+memory_cache = TTLCache(
+    max_entries=settings.copy_cache_max_entries,
+    ttl=settings.copy_cache_ttl_seconds,
+)
+# Hashes of API keys Anthropic has recently accepted. Cache keys do not
+# include the caller, so a hit is only served to a key on this list.
+verified_keys = TTLCache(
+    max_entries=settings.copy_cache_max_entries,
+    ttl=settings.copy_cache_key_ttl_seconds,
+)
+stats = {"hits": 0, "misses": 0}
+
+
+def _normalise(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalise(v) for v in value]
+    return value
+
+
+def make_cache_key(brief: CampaignBrief, include_image_prompt: bool = True) -> str:
+    payload = {
+        "brief": {field: _normalise(value) for field, value in brief.model_dump().items()},
+        "include_image_prompt": include_image_prompt,
+        "model": CLAUDE_MODEL,
+        "template": PROMPT_TEMPLATE_VERSION,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_cached_copy(db: AsyncSession, cache_key: str) -> CopyGenerationResponse | None:
+    cached = memory_cache.get(cache_key)
+    if cached is not None:
+        return CopyGenerationResponse.model_validate(cached)
+
+    if not settings.copy_cache_shared:
+        return None
+
+    query = select(CopyCacheEntry.response).where(
+        CopyCacheEntry.cache_key == cache_key,
+        CopyCacheEntry.expires_at > datetime.utcnow(),
+    )
+    try:
+        result = await db.execute(query)
+    except Exception as e:
+        logger.warning(f"Shared copy cache lookup failed: {e}")
+        await db.rollback()
+        return None
+    cached = result.scalar_one_or_none()
+    if cached is None:
+        return None
+
+    memory_cache.set(cache_key, cached)
+    return CopyGenerationResponse.model_validate(cached)
+
+
+async def store_copy(db: AsyncSession, cache_key: str, response: CopyGenerationResponse) -> None:
+    data = response.model_dump()
+    memory_cache.set(cache_key, data)
+
+    if not settings.copy_cache_shared:
+        return
+
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.copy_cache_ttl_seconds)
+    stmt = pg_insert(CopyCacheEntry).values(
+        cache_key=cache_key,
+        response=data,
+        expires_at=expires_at,
+    ).on_conflict_do_update(
+        index_elements=[CopyCacheEntry.cache_key],
+        set_={"response": data, "expires_at": expires_at, "created_at": datetime.utcnow()},
+    )
+    try:
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        logger.warning(f"Shared copy cache write failed: {e}")
+        await db.rollback()
+
+
+async def generate_copy_cached(
+    db: AsyncSession,
+    brief: CampaignBrief,
+    api_key: str,
+    include_image_prompt: bool = True,
+    mode: str = "default",
+) -> tuple[CopyGenerationResponse, str]:
+    """Return ``(response, status)`` where status is HIT, MISS or BYPASS.
+
+    Entries are shared by every caller, so a hit needs a key that completed a
+    real generation in the last ``copy_cache_key_ttl_seconds``. Any other key
+    gets a MISS, and that call is what checks it with Anthropic.
+    """
+    key_hash = hash_api_key(api_key)
+    if not settings.copy_cache_enabled or mode == "bypass":
+        response = await generate_copy(brief, api_key, include_image_prompt=include_image_prompt)
+        verified_keys.set(key_hash, True)
+        return response, "BYPASS"
+
+    cache_key = make_cache_key(brief, include_image_prompt)
+
+    if mode != "refresh" and verified_keys.get(key_hash):
+        cached = await get_cached_copy(db, cache_key)
+        if cached is not None:
+            stats["hits"] += 1
+            return cached, "HIT"
+
+    stats["misses"] += 1
+    response = await generate_copy(brief, api_key, include_image_prompt=include_image_prompt)
+    verified_keys.set(key_hash, True)
+    await store_copy(db, cache_key, response)
+    return response, "MISS"
+
+
+def cache_headers(status: str) -> dict[str, str]:
+    return {
+        "X-Cache": status,
+        "X-Cache-Hits": str(stats["hits"]),
+        "X-Cache-Misses": str(stats["misses"]),
+    }
@@ -0,0 +1,149 @@
+import re
+
+from app.schemas.campaign import PlatformCopy
+
+
+# Matches [PLATFORM: name], [COPY], [/COPY], [IMAGE_PROMPT] and [/IMAGE_PROMPT],
+# tolerating stray whitespace, any letter case and "IMAGE PROMPT" without the underscore.
+# Every part is bounded and names cannot contain brackets, so a marker is never
+# longer than MAX_MARKER_LENGTH and always starts at the last "[" before its "]".
+MARKER_PATTERN = re.compile(
+    r"\[\s{0,8}(/?)\s{0,8}(PLATFORM|COPY|IMAGE[\s_]{0,3}PROMPT)\s{0,8}(?::\s{0,8}([^\[\]\n]{0,40}?))?\s{0,8}\]",
+    re.IGNORECASE,
+)
+# A chunk ending in an unclosed "[" shorter than this may be the start of a
+# marker, so it is held back until the next chunk arrives.
+MAX_MARKER_LENGTH = 100
+
+_OUTSIDE = 0
+_AWAITING_COPY = 1
+_IN_COPY = 2
+_IN_IMAGE_PROMPT = 3
+
+
+class CopyResponseParser:
+    """Single-pass state machine over a Claude copy response.
+
+    Text can be fed in arbitrary chunks; each ``feed`` returns the copies whose
+    block closed within it, so the same parser serves both streaming and
+    whole-response parsing. Every character is scanned once.
+
+    Malformed output is handled leniently: a ``[COPY]`` without a platform is
+    assigned to the next requested platform still missing, and a copy left
+    open by a following marker or the end of the response is still kept.
+    """
+
+    def __init__(self, platforms: list[str]):
+        self.platforms = platforms
+        self._platform_names = {p.strip().lower(): p for p in platforms}
+        self._emitted: set[str] = set()
+        self._chunks: list[str] = []
+        self._pending = ""
+        self._state = _OUTSIDE
+        self._platform: str | None = None
+        self._parts: list[str] = []
+        self._image_prompt_parts: list[str] | None = None
+        self.image_prompt = ""
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> list[PlatformCopy]:
+        self._chunks.append(chunk)
+        buffer = self._pending + chunk
+        copies: list[PlatformCopy] = []
+        position = 0
+
+        for match in MARKER_PATTERN.finditer(buffer):
+            self._consume_text(buffer[position:match.start()])
+            self._handle_marker(match, copies)
+            position = match.end()
+
+        rest = buffer[position:]
+        held = rest.rfind("[")
+        if held != -1 and "]" not in rest[held:] and len(rest) - held < MAX_MARKER_LENGTH:
+            self._consume_text(rest[:held])
+            self._pending = rest[held:]
+        else:
+            self._consume_text(rest)
+            self._pending = ""
+
+        return copies
+
+    def finish(self) -> list[PlatformCopy]:
+        copies: list[PlatformCopy] = []
+        self._consume_text(self._pending)
+        self._pending = ""
+        if self._state == _IN_COPY:
+            self._close_copy(copies)
+        elif self._state == _IN_IMAGE_PROMPT:
+            self._close_image_prompt()
+        return copies
+
+    def _consume_text(self, text: str) -> None:
+        if not text:
+            return
+        if self._state == _IN_COPY:
+            self._parts.append(text)
+        elif self._state == _IN_IMAGE_PROMPT:
+            self._image_prompt_parts.append(text)
+
+    def _handle_marker(self, match: re.Match, copies: list[PlatformCopy]) -> None:
+        closing = bool(match.group(1))
+        kind = match.group(2).upper()
+
+        if kind == "PLATFORM":
+            if self._state == _IN_COPY:
+                self._close_copy(copies)
+            elif self._state == _IN_IMAGE_PROMPT:
+                self._close_image_prompt()
+            self._platform = self._platform_names.get((match.group(3) or "").strip().lower())
+            self._state = _AWAITING_COPY
+        elif kind == "COPY":
+            if closing:
+                if self._state == _IN_COPY:
+                    self._close_copy(copies)
+            elif self._state != _IN_COPY:
+                if self._state != _AWAITING_COPY:
+                    self._platform = self._next_missing_platform()
+                self._parts = []
+                self._state = _IN_COPY
+        else:
+            if closing:
+                if self._state == _IN_IMAGE_PROMPT:
+                    self._close_image_prompt()
+            else:
+                if self._state == _IN_COPY:
+                    self._close_copy(copies)
+                self._image_prompt_parts = []
+                self._state = _IN_IMAGE_PROMPT
+
+    def _next_missing_platform(self) -> str | None:
+        for platform in self.platforms:
+            if platform not in self._emitted:
+                return platform
+        return None
+
+    def _close_copy(self, copies: list[PlatformCopy]) -> None:
+        content = "".join(self._parts).strip()
+        platform = self._platform
+        self._state = _OUTSIDE
+        self._platform = None
+        self._parts = []
+        if platform is None or platform in self._emitted or not content:
+            return
+        self._emitted.add(platform)
+        copies.append(
+            PlatformCopy(
+                platform=platform,
+                content=content,
+                character_count=len(content),
+            )
+        )
+
+    def _close_image_prompt(self) -> None:
+        if not self.image_prompt:
+            self.image_prompt = "".join(self._image_prompt_parts).strip()
+        self._image_prompt_parts = None
+        self._state = _OUTSIDE
@@ -1,22 +1,45 @@
-from openai import AsyncOpenAI
 from openai import APIError, APIConnectionError, AuthenticationError, RateLimitError
 
+from app.core.ai_clients import ai_clients
+from app.core.config import get_settings
+from app.core.single_flight import SingleFlight, make_flight_key
+from app.core.upstream import upstream
 from app.core.exceptions import AIServiceException, APIException
 
 
+settings = get_settings()
+
+IMAGE_MODEL = "dall-e-3"
+IMAGE_QUALITY = "standard"
+
+image_flights = SingleFlight()
+
+
+def enhance_prompt(prompt: str) -> str:
+    return f"{prompt}. Professional marketing photograph, high quality, suitable for social media advertising, no text overlays."
+
+
 async def generate_image(prompt: str, api_key: str, size: str = "1024x1024") -> dict:
-    client = AsyncOpenAI(api_key=api_key)
+    enhanced_prompt = enhance_prompt(prompt)
+
+    result = await image_flights.do(
+        make_flight_key(api_key, size, enhanced_prompt),
+        lambda: _request_image(enhanced_prompt, api_key, size),
+    )
+    return dict(result)
 
-    enhanced_prompt = f"{prompt}. Professional marketing photograph, high quality, suitable for social media advertising, no text overlays."
+
+async def _request_image(enhanced_prompt: str, api_key: str, size: str) -> dict:
+    client = ai_clients.get_openai(api_key)
 
     try:
-        response = await client.images.generate(
-            model="dall-e-3",
+        response = await upstream.call("openai", api_key, lambda: client.images.generate(
+            model=IMAGE_MODEL,
             prompt=enhanced_prompt,
             size=size,
-            quality="standard",
+            quality=IMAGE_QUALITY,
             n=1,
-        )
+        ), deadline=settings.upstream_generation_deadline_seconds, retries=0)
 
         return {
             "success": True,
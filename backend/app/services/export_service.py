@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.schemas.campaign import CampaignRecord
+from app.services import campaign_service
+
+
+settings = get_settings()
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+CSV_COLUMNS = list(CampaignRecord.model_fields)
+
+
+def _ndjson_rows(records: list[dict]) -> str:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def _csv_rows(records: list[dict]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([
+            json.dumps(record[column], ensure_ascii=False) if isinstance(record[column], (list, dict)) else record[column]
+            for column in CSV_COLUMNS
+        ])
+    return buffer.getvalue()
+
+
+def to_utc_naive(value: datetime | None) -> datetime | None:
+    """Campaign timestamps are stored as naive UTC; convert aware filters to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def media_type(export_format: str, compress: bool) -> str:
+    return "application/gzip" if compress else EXPORT_FORMATS[export_format][0]
+
+
+def filename(export_format: str, compress: bool) -> str:
+    name = f"campaigns.{EXPORT_FORMATS[export_format][1]}"
+    return f"{name}.gz" if compress else name
+
+
+async def stream_export(
+    export_format: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield every matching campaign as NDJSON or CSV, one chunk per fetched batch.
+
+    Rows come from a server-side cursor and are written out as each batch
+    arrives, so memory use does not grow with the number of campaigns. With
+    ``compress`` the output is a single gzip stream, flushed after each batch.
+    """
+    encode_rows = _csv_rows if export_format == "csv" else _ndjson_rows
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if export_format == "csv":
+        header = io.StringIO()
+        csv.writer(header).writerow(CSV_COLUMNS)
+        yield encode(header.getvalue())
+
+    # The request's session is closed before a streaming body is sent, so
+    # the export reads through a session of its own.
+    async with AsyncSessionLocal() as db:
+        async for batch in campaign_service.stream_campaign_batches(
+            db, since, until, batch_size=settings.export_batch_size
+        ):
+            records = [CampaignRecord.model_validate(c).model_dump(mode="json") for c in batch]
+            yield encode(encode_rows(records))
+
+    if compressor is not None:
+        yield compressor.flush()
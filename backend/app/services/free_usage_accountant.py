@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models.free_usage import FreeUsage
+from app.services import free_usage_service
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class FreeUsageAccountant:
+    """In-process, write-behind free tier quota counter.
+
+    Today's per-IP counts live in memory and reservations never wait on the
+    database once an IP has been seen. Increments are flushed to the
+    ``free_usage`` table in batches, which remains the durable source of truth:
+    the first lookup for an IP each day seeds its count from the table.
+
+    Counts are per process, so this is intended for single-worker deployments.
+    """
+
+    def __init__(self, daily_limit: int, flush_interval: float):
+        self.daily_limit = daily_limit
+        self.flush_interval = flush_interval
+        self._counts: dict[date, dict[str, int]] = {}
+        self._pending: dict[date, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._flush_task: asyncio.Task | None = None
+
+    def _day_counts(self, day: date) -> dict[str, int]:
+        if day not in self._counts:
+            # Midnight rollover: yesterday's counters are no longer needed.
+            self._counts = {day: {}}
+        return self._counts[day]
+
+    async def _load(self, db: AsyncSession, ip_address: str, day: date) -> dict[str, int]:
+        counts = self._day_counts(day)
+        if ip_address not in counts:
+            usage = await free_usage_service.get_usage_today(db, ip_address)
+            counts = self._day_counts(day)
+            # Another request may have seeded the count while we were waiting.
+            counts.setdefault(ip_address, usage.generation_count if usage else 0)
+        return counts
+
+    async def reserve_slot(self, db: AsyncSession, ip_address: str, usage_date: date) -> int | None:
+        counts = await self._load(db, ip_address, usage_date)
+        if counts[ip_address] >= self.daily_limit:
+            return None
+        counts[ip_address] += 1
+        self._pending[usage_date][ip_address] += 1
+        return self.daily_limit - counts[ip_address]
+
+    def release_slot(self, ip_address: str, usage_date: date) -> None:
+        """Hand back a slot reserved on ``usage_date``.
+
+        After midnight that day's counters are gone from memory, but the
+        reservation is still pending or already flushed, so the refund is
+        queued against the same day.
+        """
+        counts = self._counts.get(usage_date)
+        if counts is None:
+            self._pending[usage_date][ip_address] -= 1
+        elif counts.get(ip_address, 0) > 0:
+            counts[ip_address] -= 1
+            self._pending[usage_date][ip_address] -= 1
+
+    async def get_remaining(self, db: AsyncSession, ip_address: str) -> int:
+        counts = await self._load(db, ip_address, date.today())
+        return max(0, self.daily_limit - counts[ip_address])
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        rows = [
+            {"ip_address": ip, "usage_date": day, "generation_count": delta}
+            for day, deltas in pending.items()
+            for ip, delta in deltas.items()
+            if delta
+        ]
+        if not rows:
+            return
+
+        stmt = pg_insert(FreeUsage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_ip_date",
+            set_={"generation_count": FreeUsage.generation_count + stmt.excluded.generation_count,
+                  "updated_at": datetime.utcnow()},
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush free usage counters: {e}")
+            self._requeue(rows)
+        except asyncio.CancelledError:
+            self._requeue(rows)
+            raise
+
+    def _requeue(self, rows: list[dict]) -> None:
+        for row in rows:
+            self._pending[row["usage_date"]][row["ip_address"]] += row["generation_count"]
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+
+accountant = FreeUsageAccountant(
+    daily_limit=settings.free_tier_daily_limit,
+    flush_interval=settings.free_tier_flush_interval_seconds,
+)
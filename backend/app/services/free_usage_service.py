@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
@@ -20,20 +20,51 @@ async def get_usage_today(db: AsyncSession, ip_address: str) -> FreeUsage | None
     return result.scalar_one_or_none()
 
 
-async def increment_usage(db: AsyncSession, ip_address: str) -> int:
+async def reserve_slot(db: AsyncSession, ip_address: str, usage_date: date) -> int | None:
+    """Atomically claim one of ``usage_date``'s free generations for ``ip_address``.
+
+    Returns the number of generations remaining after the reservation, or
+    ``None`` if the daily limit has already been reached.
+    """
+    limit = settings.free_tier_daily_limit
+    if limit <= 0:
+        return None
+
     stmt = pg_insert(FreeUsage).values(
         ip_address=ip_address,
-        usage_date=date.today(),
+        usage_date=usage_date,
         generation_count=1,
     ).on_conflict_do_update(
         constraint="uq_ip_date",
         set_={"generation_count": FreeUsage.generation_count + 1,
               "updated_at": datetime.utcnow()},
+        where=FreeUsage.generation_count < limit,
     ).returning(FreeUsage.generation_count)
 
     result = await db.execute(stmt)
     await db.commit()
-    return result.scalar_one()
+    count = result.scalar_one_or_none()
+    if count is None:
+        return None
+    return max(0, limit - count)
+
+
+async def release_slot(db: AsyncSession, ip_address: str, usage_date: date) -> None:
+    """Hand back a slot reserved on ``usage_date``, even if midnight has since passed."""
+    stmt = (
+        update(FreeUsage)
+        .where(
+            FreeUsage.ip_address == ip_address,
+            FreeUsage.usage_date == usage_date,
+            FreeUsage.generation_count > 0,
+        )
+        .values(
+            generation_count=FreeUsage.generation_count - 1,
+            updated_at=datetime.utcnow(),
+        )
+    )
+    await db.execute(stmt)
+    await db.commit()
 
 
 async def get_remaining(db: AsyncSession, ip_address: str) -> int:
@@ -41,7 +72,3 @@ async def get_remaining(db: AsyncSession, ip_address: str) -> int:
     if usage is None:
         return settings.free_tier_daily_limit
     return max(0, settings.free_tier_daily_limit - usage.generation_count)
-
-
-async def can_generate(db: AsyncSession, ip_address: str) -> bool:
-    return (await get_remaining(db, ip_address)) > 0
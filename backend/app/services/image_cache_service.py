@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import APIException, CircuitOpenException
+from app.models.campaign import Campaign
+from app.models.image_cache import ImageCacheEntry
+from app.services import image_service
+from app.services.dalle_service import IMAGE_MODEL, IMAGE_QUALITY, enhance_prompt, generate_image
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Eviction runs once this share of the byte budget has been added by this process.
+EVICT_AFTER_FRACTION = 0.05
+
+_indexing: set[asyncio.Task] = set()
+_bytes_since_evict = 0
+
+
+def make_cache_key(prompt: str, size: str) -> str:
+    payload = {
+        "prompt": enhance_prompt(" ".join(prompt.casefold().split())),
+        "size": size,
+        "quality": IMAGE_QUALITY,
+        "model": IMAGE_MODEL,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_cached_image(db: AsyncSession, cache_key: str) -> dict | None:
+    now = datetime.utcnow()
+    stmt = (
+        update(ImageCacheEntry)
+        .where(ImageCacheEntry.cache_key == cache_key, ImageCacheEntry.expires_at > now)
+        .values(last_used_at=now)
+        .returning(ImageCacheEntry.digest, ImageCacheEntry.revised_prompt)
+    )
+    try:
+        result = await db.execute(stmt)
+        row = result.one_or_none()
+        await db.commit()
+    except Exception as e:
+        logger.warning(f"Image cache lookup failed: {e}")
+        await db.rollback()
+        return None
+    if row is None:
+        return None
+    return {
+        "success": True,
+        "image_url": image_service.image_url(row.digest),
+        "revised_prompt": row.revised_prompt,
+    }
+
+
+async def store_image(db: AsyncSession, cache_key: str, result: dict) -> None:
+    """Mirror a fresh DALL-E image and index it under ``cache_key``."""
+    global _bytes_since_evict
+    digest, size_bytes = await image_service.mirror_image(result["image_url"])
+
+    now = datetime.utcnow()
+    values = {
+        "digest": digest,
+        "revised_prompt": result["revised_prompt"],
+        "size_bytes": size_bytes,
+        "expires_at": now + timedelta(seconds=settings.image_cache_ttl_seconds),
+        "last_used_at": now,
+    }
+    stmt = pg_insert(ImageCacheEntry).values(cache_key=cache_key, **values).on_conflict_do_update(
+        index_elements=[ImageCacheEntry.cache_key],
+        set_=values,
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+    _bytes_since_evict += size_bytes
+    if _bytes_since_evict >= settings.image_cache_max_bytes * EVICT_AFTER_FRACTION:
+        _bytes_since_evict = 0
+        await evict(db)
+
+
+async def _index_in_background(cache_key: str, result: dict) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await store_image(db, cache_key, result)
+    except Exception as e:
+        logger.warning(f"Image cache write failed: {e}")
+
+
+def schedule_store(cache_key: str, result: dict) -> None:
+    """Index a fresh image after the response has gone out, like campaign mirroring."""
+    task = asyncio.create_task(_index_in_background(cache_key, result))
+    _indexing.add(task)
+    task.add_done_callback(_indexing.discard)
+
+
+async def evict(db: AsyncSession) -> None:
+    """Drop expired entries, then least recently used ones until within the byte budget.
+
+    Stored images are only deleted when no other entry or campaign still uses them.
+    """
+    result = await db.execute(
+        delete(ImageCacheEntry)
+        .where(ImageCacheEntry.expires_at <= datetime.utcnow())
+        .returning(ImageCacheEntry.digest)
+    )
+    digests = set(result.scalars())
+
+    total = (await db.execute(select(func.coalesce(func.sum(ImageCacheEntry.size_bytes), 0)))).scalar_one()
+    if total > settings.image_cache_max_bytes:
+        result = await db.execute(
+            select(ImageCacheEntry.cache_key, ImageCacheEntry.digest, ImageCacheEntry.size_bytes)
+            .order_by(ImageCacheEntry.last_used_at)
+        )
+        victims = []
+        for entry in result:
+            if total <= settings.image_cache_max_bytes:
+                break
+            victims.append(entry.cache_key)
+            digests.add(entry.digest)
+            total -= entry.size_bytes
+        await db.execute(delete(ImageCacheEntry).where(ImageCacheEntry.cache_key.in_(victims)))
+    await db.commit()
+    if not digests:
+        return
+
+    cached = await db.execute(select(ImageCacheEntry.digest).where(ImageCacheEntry.digest.in_(digests)))
+    urls = {image_service.image_url(digest): digest for digest in digests}
+    campaigns = await db.execute(select(Campaign.image_url).where(Campaign.image_url.in_(urls)))
+    in_use = set(cached.scalars()) | {urls[url] for url in campaigns.scalars()}
+    for digest in digests - in_use:
+        await image_service.delete_image(digest)
+
+
+async def generate_image_cached(
+    db: AsyncSession,
+    prompt: str,
+    api_key: str,
+    size: str = "1024x1024",
+    mode: str = "default",
+) -> tuple[dict, str]:
+    """Return ``(result, status)`` where status is HIT, MISS or BYPASS.
+
+    A MISS returns DALL-E's URL straight away; the image is mirrored and
+    indexed in the background, so only later requests are served from cache.
+
+    The cache is bypassed until PUBLIC_BASE_URL is set, since cached images
+    are served from our own storage.
+    """
+    if not settings.image_cache_enabled or not image_service.can_serve_images() or mode == "bypass":
+        return await generate_image(prompt=prompt, api_key=api_key, size=size), "BYPASS"
+
+    cache_key = make_cache_key(prompt, size)
+
+    if mode != "refresh":
+        cached = await get_cached_image(db, cache_key)
+        if cached is not None:
+            return cached, "HIT"
+
+    result = await generate_image(prompt=prompt, api_key=api_key, size=size)
+    schedule_store(cache_key, result)
+    return result, "MISS"
+
+
+async def try_generate_image(
+    db: AsyncSession,
+    prompt: str,
+    api_key: str,
+    mode: str = "default",
+) -> tuple[dict | None, str]:
+    """Generate a campaign image without letting a failure fail the campaign.
+
+    Returns ``(result, status)`` where status is "ok", "skipped" (the image
+    provider's circuit is open, so nothing was sent) or "failed".
+    """
+    try:
+        result, _ = await generate_image_cached(db, prompt, api_key, mode=mode)
+        return result, "ok"
+    except CircuitOpenException:
+        return None, "skipped"
+    except Exception as e:
+        logger.warning(f"Image generation failed: {e}", exc_info=not isinstance(e, APIException))
+        return None, "failed"
+
+
+def image_message(image_status: str, success: str) -> str:
+    if image_status == "skipped":
+        return "Copy generated, image generation temporarily unavailable"
+    if image_status == "failed":
+        return "Copy generated, image generation failed"
+    return success
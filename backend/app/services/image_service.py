@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import io
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+from app.core.ai_clients import ai_clients
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.image_storage import CHUNK_SIZE, content_type_for, get_image_storage
+from app.core.single_flight import SingleFlight
+from app.services import campaign_service
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+# Objects up to this size are also kept in memory once read.
+MEMORY_CACHE_MAX_OBJECT_BYTES = 1024 * 1024
+
+PLATFORM_IMAGE_SIZES = {
+    "Instagram": (1080, 1080),
+    "Facebook": (1200, 630),
+    "LinkedIn": (1200, 627),
+    "X": (1600, 900),
+    "TikTok": (1080, 1920),
+}
+
+storage = get_image_storage()
+byte_cache = TTLCache(
+    max_entries=settings.image_memory_cache_entries,
+    ttl=settings.image_cache_max_age_seconds,
+)
+variant_flights = SingleFlight()
+
+
+@dataclass
+class StoredImage:
+    key: str
+    size: int
+    content_type: str
+    etag: str
+    data: bytes | None = None
+
+
+def image_key(digest: str, platform: str | None = None) -> str:
+    if platform is None:
+        return f"{digest}.png"
+    return f"{digest}-{platform.lower()}.jpg"
+
+
+def image_url(digest: str) -> str:
+    return f"{settings.public_base_url.rstrip('/')}/api/v1/images/{digest}"
+
+
+async def download_image(url: str) -> bytes:
+    client = ai_clients.get_http_client()
+    chunks = []
+    size = 0
+    async with client.stream("GET", url, timeout=30.0) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > MAX_IMAGE_BYTES:
+                raise ValueError(f"Image exceeds {MAX_IMAGE_BYTES} bytes")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def can_serve_images() -> bool:
+    """Stored images need an absolute URL: the frontend runs on another origin."""
+    return bool(settings.public_base_url)
+
+
+def is_mirrored(url: str) -> bool:
+    return url.startswith(image_url(""))
+
+
+async def mirror_image(url: str) -> tuple[str, int]:
+    """Copy an image into storage and return its SHA-256 digest and size."""
+    data = await download_image(url)
+    digest = hashlib.sha256(data).hexdigest()
+    key = image_key(digest)
+    if await storage.size(key) is None:
+        await storage.put(key, data)
+    return digest, len(data)
+
+
+async def delete_image(digest: str) -> None:
+    """Remove an image and any platform variants made from it."""
+    for key in [image_key(digest), *(image_key(digest, p) for p in PLATFORM_IMAGE_SIZES)]:
+        byte_cache.delete(key)
+        await storage.delete(key)
+
+
+async def mirror_campaign_image(campaign_id: int, url: str) -> None:
+    """Background task: mirror a DALL-E image and point the campaign at our copy."""
+    if not settings.image_mirror_enabled or not can_serve_images() or is_mirrored(url):
+        return
+    try:
+        digest, _ = await mirror_image(url)
+        async with AsyncSessionLocal() as db:
+            await campaign_service.update_image_url(db, campaign_id, image_url(digest))
+    except Exception as e:
+        logger.warning(f"Failed to mirror image for campaign {campaign_id}: {e}")
+
+
+def _resize(data: bytes, size: tuple[int, int]) -> bytes:
+    with Image.open(io.BytesIO(data)) as image:
+        resized = ImageOps.fit(image.convert("RGB"), size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, "JPEG", quality=88, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+async def _create_variant(digest: str, platform: str) -> int | None:
+    original = await storage.get(image_key(digest))
+    if original is None:
+        return None
+    key = image_key(digest, platform)
+    data = await asyncio.to_thread(_resize, original, PLATFORM_IMAGE_SIZES[platform])
+    await storage.put(key, data)
+    byte_cache.set(key, data)
+    return len(data)
+
+
+async def get_image(digest: str, platform: str | None = None) -> StoredImage | None:
+    """Look up a mirrored image, resizing it for ``platform`` on first request.
+
+    Each platform variant is created once, stored next to the original and
+    reused from then on.
+    """
+    key = image_key(digest, platform)
+    data = byte_cache.get(key)
+    if data is None:
+        size = await storage.size(key)
+        if size is None and platform is not None:
+            # Concurrent first requests for the same variant share one resize.
+            size = await variant_flights.do(key, lambda: _create_variant(digest, platform))
+            data = byte_cache.get(key)
+        if size is None:
+            return None
+        if data is None and size <= MEMORY_CACHE_MAX_OBJECT_BYTES:
+            data = await storage.get(key)
+            if data is not None:
+                byte_cache.set(key, data)
+    return StoredImage(
+        key=key,
+        size=len(data) if data is not None else size,
+        content_type=content_type_for(key),
+        etag=f'"{key}"',
+        data=data,
+    )
+
+
+async def iter_image(image: StoredImage, start: int, end: int) -> AsyncIterator[bytes]:
+    """Yield bytes ``start``..``end`` (inclusive) of a stored image."""
+    if image.data is not None:
+        for offset in range(start, end + 1, CHUNK_SIZE):
+            yield image.data[offset:min(offset + CHUNK_SIZE, end + 1)]
+        return
+    async for chunk in storage.iter_range(image.key, start, end):
+        yield chunk
@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import logging
+import socket
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ai_clients import ai_clients
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.dependencies import api_key_matches, hash_api_key
+from app.core.exceptions import APIException, BadRequestException
+from app.models.campaign_job import CampaignJob
+from app.schemas.campaign import CampaignBrief
+from app.schemas.image import CampaignFullResponse
+from app.schemas.job import CampaignJobRequest, CampaignJobResponse
+from app.services import campaign_service, image_cache_service, image_service
+from app.services.claude_service import generate_copy
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INTERRUPTED = {
+    "success": False,
+    "error": "job_interrupted",
+    "detail": "The server restarted before this job finished. Please submit it again.",
+}
+
+
+async def check_webhook_url(url: str) -> None:
+    """Reject webhook URLs whose host resolves to a loopback, private or otherwise non-public address."""
+    parts = urlsplit(url)
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError):
+        raise BadRequestException(
+            error="invalid_webhook_url",
+            detail=f"Could not resolve the webhook host {parts.hostname}.",
+        )
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise BadRequestException(
+                error="invalid_webhook_url",
+                detail="Webhook URLs must point to a public host.",
+            )
+
+
+def job_response(job: CampaignJob) -> CampaignJobResponse:
+    return CampaignJobResponse(
+        success=job.status != "failed",
+        job_id=job.id,
+        status=job.status,
+        campaign_id=job.campaign_id,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+    )
+
+
+async def get_job(db: AsyncSession, job_id: int, anthropic_key: str) -> CampaignJob | None:
+    """The job, if it exists and was submitted with ``anthropic_key``."""
+    query = select(CampaignJob).where(CampaignJob.id == job_id)
+    result = await db.execute(query)
+    job = result.scalar_one_or_none()
+    if job is None or not api_key_matches(job.api_key_hash, anthropic_key):
+        return None
+    return job
+
+
+async def generate_full_campaign(
+    db: AsyncSession,
+    brief: CampaignBrief,
+    api_keys: dict,
+    save: bool = True,
+    image_cache: str = "default",
+) -> tuple[CampaignFullResponse, int | None]:
+    copy_result = await generate_copy(brief, api_keys["anthropic_key"])
+    image_result, image_status = await image_cache_service.try_generate_image(
+        db, copy_result.image_prompt, api_keys["openai_key"], image_cache
+    )
+    image_url = image_result["image_url"] if image_result else None
+
+    campaign_id = None
+    if save:
+        campaign = await campaign_service.save_campaign(
+            db=db,
+            brief=brief,
+            copies=copy_result.copies,
+            image_prompt=copy_result.image_prompt,
+            image_url=image_url,
+        )
+        campaign_id = campaign.id
+        if image_url:
+            await image_service.mirror_campaign_image(campaign.id, image_url)
+
+    response = CampaignFullResponse(
+        success=True,
+        business_name=copy_result.business_name,
+        copies=[c.model_dump() for c in copy_result.copies],
+        image_prompt=copy_result.image_prompt,
+        image_url=image_url,
+        revised_image_prompt=image_result["revised_prompt"] if image_result else None,
+        message=image_cache_service.image_message(image_status, "Campaign generated successfully"),
+    )
+    return response, campaign_id
+
+
+class CampaignJobWorkerPool:
+    """Runs queued full-campaign jobs outside the request cycle.
+
+    Jobs are rows in ``campaign_jobs`` claimed with ``SELECT ... FOR UPDATE
+    SKIP LOCKED``, so no two workers pick up the same job. Callers' API keys
+    are never written to the database: they stay in memory in the process
+    that accepted the job, and only that process (its ``owner`` id) claims
+    it, so workers wait for ``submit`` to wake them rather than polling. Each pool regularly touches its own unfinished jobs and fails other
+    owners' jobs that have not been touched for ``stale_after`` seconds, so
+    jobs orphaned by a restart do not stay queued forever.
+    """
+
+    def __init__(self, workers: int, retry_interval: float, stale_after: float):
+        self.workers = workers
+        self.retry_interval = retry_interval
+        self.stale_after = stale_after
+        self.owner = uuid.uuid4().hex
+        self._keys: dict[int, dict] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def submit(self, db: AsyncSession, request: CampaignJobRequest, api_keys: dict) -> CampaignJob:
+        if request.webhook_url:
+            await check_webhook_url(str(request.webhook_url))
+        job = CampaignJob(
+            owner=self.owner,
+            api_key_hash=hash_api_key(api_keys["anthropic_key"]),
+            brief=request.brief.model_dump(),
+            save=request.save,
+            image_cache=request.image_cache,
+            webhook_url=str(request.webhook_url) if request.webhook_url else None,
+        )
+        db.add(job)
+        await db.flush()
+        # Workers may claim the job as soon as it is committed, so its keys must already be here.
+        self._keys[job.id] = api_keys
+        try:
+            await db.commit()
+        except BaseException:
+            self._keys.pop(job.id, None)
+            raise
+        await db.refresh(job)
+        self._wakeup.set()
+        return job
+
+    async def _claim(self) -> CampaignJob | None:
+        async with AsyncSessionLocal() as db:
+            query = (
+                select(CampaignJob)
+                .where(CampaignJob.owner == self.owner, CampaignJob.status == "queued")
+                .order_by(CampaignJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = (await db.execute(query)).scalar_one_or_none()
+            if job is None:
+                return None
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            job.attempts += 1
+            await db.commit()
+            return job
+
+    async def _finish(self, job: CampaignJob, status: str, **values) -> None:
+        job.status = status
+        job.completed_at = datetime.utcnow()
+        for name, value in values.items():
+            setattr(job, name, value)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(CampaignJob)
+                .where(CampaignJob.id == job.id)
+                .values(status=status, completed_at=job.completed_at, **values)
+            )
+            await db.commit()
+
+    async def _run(self, job: CampaignJob) -> None:
+        api_keys = self._keys.pop(job.id, None)
+        try:
+            if api_keys is None:
+                await self._finish(job, "failed", error=INTERRUPTED)
+            else:
+                async with AsyncSessionLocal() as db:
+                    result, campaign_id = await generate_full_campaign(
+                        db,
+                        CampaignBrief.model_validate(job.brief),
+                        api_keys,
+                        save=job.save,
+                        image_cache=job.image_cache,
+                    )
+                await self._finish(
+                    job,
+                    "succeeded",
+                    result=result.model_dump(mode="json"),
+                    campaign_id=campaign_id,
+                )
+        except asyncio.CancelledError:
+            await self._finish(job, "failed", error=INTERRUPTED)
+            raise
+        except APIException as e:
+            await self._finish(job, "failed", error=e.detail)
+        except Exception as e:
+            logger.error(f"Campaign job {job.id} failed: {e}", exc_info=True)
+            await self._finish(job, "failed", error={
+                "success": False,
+                "error": "Internal server error",
+                "detail": "An unexpected error occurred",
+            })
+
+        if job.webhook_url:
+            await self._notify(job)
+
+    async def _notify(self, job: CampaignJob) -> None:
+        try:
+            # Checked again at delivery: the host may resolve differently than at submission.
+            await check_webhook_url(job.webhook_url)
+        except BadRequestException as e:
+            logger.warning(f"Webhook for job {job.id} not sent: {e.detail['detail']}")
+            return
+        body = job_response(job).model_dump_json().encode("utf-8")
+        headers = {"Content-Type": "application/json", "X-Job-Id": str(job.id)}
+        if settings.job_webhook_secret:
+            signature = hmac.new(settings.job_webhook_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        client = ai_clients.get_http_client()
+        for attempt in range(settings.job_webhook_attempts):
+            try:
+                response = await client.post(job.webhook_url, content=body, headers=headers, timeout=10.0)
+                if response.is_success:
+                    return
+                logger.warning(f"Webhook for job {job.id} returned {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Webhook for job {job.id} failed: {e}")
+            if attempt + 1 < settings.job_webhook_attempts:
+                await asyncio.sleep(2 ** attempt)
+
+    async def _sweep_stale(self) -> None:
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.stale_after)
+        async with AsyncSessionLocal() as db:
+            # Heartbeat: this process is alive, so its own jobs are not stale.
+            await db.execute(
+                update(CampaignJob)
+                .where(CampaignJob.status.in_(["queued", "running"]), CampaignJob.owner == self.owner)
+                .values(updated_at=now)
+            )
+            await db.execute(
+                update(CampaignJob)
+                .where(
+                    CampaignJob.status.in_(["queued", "running"]),
+                    CampaignJob.owner != self.owner,
+                    CampaignJob.updated_at < cutoff,
+                )
+                .values(status="failed", error=INTERRUPTED, completed_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim campaign job: {e}")
+                await asyncio.sleep(self.retry_interval)
+                continue
+            if job is not None:
+                await self._run(job)
+                continue
+            await self._wakeup.wait()
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                await self._sweep_stale()
+            except Exception as e:
+                logger.error(f"Failed to clean up stale campaign jobs: {e}")
+            await asyncio.sleep(self.stale_after / 3)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+worker_pool = CampaignJobWorkerPool(
+    workers=settings.job_workers,
+    retry_interval=settings.job_retry_interval_seconds,
+    stale_after=settings.job_stale_seconds,
+)
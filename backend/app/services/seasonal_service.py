@@ -1,6 +1,14 @@
+import hashlib
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
+from functools import lru_cache
 
+from app.schemas.seasonal import SeasonalResponse
+from app.services.uk_holidays import holiday_dates
 
+
+# Variable events ("variable": True) get their dates from app.services.uk_holidays;
+# their month and day here are only a typical date.
 UK_EVENTS = [
     {"name": "New Year", "month": 1, "day": 1, "duration": 7},
     {"name": "Valentine's Day", "month": 2, "day": 14, "duration": 14},
@@ -50,39 +58,83 @@ def get_current_season(today: date = None) -> str:
     return "Winter"
 
 
+def _event_date(year: int, event: dict) -> date:
+    try:
+        return date(year, event["month"], event["day"])
+    except ValueError:
+        return date(year, event["month"], 28)
+
+
+class EventCalendar:
+    """Every UK_EVENTS occurrence between two years, sorted by date.
+
+    Variable events take their exact date for each year from the holiday
+    rules. Lookups bisect into the sorted dates instead of rebuilding and
+    scanning every event; ties keep the UK_EVENTS order.
+    """
+
+    def __init__(self, start_year: int, end_year: int):
+        self.start_year = start_year
+        self.end_year = end_year
+        variable_dates = holiday_dates(start_year, end_year)
+        self.occurrences = sorted(
+            (
+                variable_dates[event["name"]][year] if event.get("variable") else _event_date(year, event),
+                index,
+                event,
+            )
+            for year in range(start_year, end_year + 1)
+            for index, event in enumerate(UK_EVENTS)
+        )
+        self.dates = [occurrence[0] for occurrence in self.occurrences]
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start_year <= start.year and end.year < self.end_year
+
+    def upcoming(self, today: date, days_ahead: int) -> list[dict]:
+        # An event is listed if its marketing window has opened or it falls
+        # within days_ahead, so nothing past the longer of the two can match.
+        horizon = today + timedelta(days=max(days_ahead, MAX_MARKETING_WINDOW))
+        end_date = today + timedelta(days=days_ahead)
+
+        upcoming = []
+        seen = set()
+        for index in range(bisect_left(self.dates, today), bisect_right(self.dates, horizon)):
+            event_date, event_index, event = self.occurrences[index]
+            if event_index in seen:
+                continue
+            seen.add(event_index)
+            lead_time = event_date - timedelta(days=event["duration"])
+            if lead_time <= today or event_date <= end_date:
+                upcoming.append({
+                    "name": event["name"],
+                    "date": event_date.isoformat(),
+                    "days_until": (event_date - today).days,
+                    "is_active": lead_time <= today,
+                    "marketing_window": event["duration"],
+                })
+        return upcoming
+
+
+MAX_MARKETING_WINDOW = max(event["duration"] for event in UK_EVENTS)
+CALENDAR_YEARS = 5
+
+_calendar = EventCalendar(date.today().year - 1, date.today().year + CALENDAR_YEARS)
+
+
+def get_calendar(start: date, end: date) -> EventCalendar:
+    global _calendar
+    if not _calendar.covers(start, end):
+        _calendar = EventCalendar(start.year - 1, end.year + CALENDAR_YEARS)
+    return _calendar
+
+
 def get_upcoming_events(today: date = None, days_ahead: int = 60) -> list[dict]:
     if today is None:
         today = date.today()
 
-    upcoming = []
-    end_date = today + timedelta(days=days_ahead)
-
-    for event in UK_EVENTS:
-        try:
-            event_date = date(today.year, event["month"], event["day"])
-        except ValueError:
-            event_date = date(today.year, event["month"], 28)
-
-        if event_date < today:
-            try:
-                event_date = date(today.year + 1, event["month"], event["day"])
-            except ValueError:
-                event_date = date(today.year + 1, event["month"], 28)
-
-        lead_time = event_date - timedelta(days=event["duration"])
-
-        if lead_time <= today <= event_date or today <= event_date <= end_date:
-            days_until = (event_date - today).days
-            upcoming.append({
-                "name": event["name"],
-                "date": event_date.isoformat(),
-                "days_until": days_until,
-                "is_active": lead_time <= today <= event_date,
-                "marketing_window": event["duration"],
-            })
-
-    upcoming.sort(key=lambda x: x["days_until"])
-    return upcoming
+    horizon = today + timedelta(days=max(days_ahead, MAX_MARKETING_WINDOW))
+    return get_calendar(today, horizon).upcoming(today, days_ahead)
 
 
 def get_seasonal_suggestions(today: date = None) -> dict:
@@ -124,3 +176,15 @@ def get_seasonal_suggestions(today: date = None) -> dict:
         "upcoming_events": future_events,
         "suggestions": suggestions,
     }
+
+
+@lru_cache(maxsize=8)
+def get_seasonal_response(today: date) -> tuple[bytes, str]:
+    """The serialised ``SeasonalResponse`` for a date and its ETag.
+
+    Suggestions only change once a day, so each date is built and encoded once.
+    """
+    response = SeasonalResponse(success=True, **get_seasonal_suggestions(today))
+    body = response.model_dump_json().encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
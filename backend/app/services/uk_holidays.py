@@ -0,0 +1,65 @@
+import calendar
+from datetime import date, timedelta
+
+
+# Years the usual bank holiday rule did not apply in England and Wales.
+BANK_HOLIDAY_OVERRIDES = {
+    ("Early May Bank Holiday", 1995): date(1995, 5, 8),  # VE Day 50th anniversary
+    ("Early May Bank Holiday", 2020): date(2020, 5, 8),  # VE Day 75th anniversary
+    ("Spring Bank Holiday", 2002): date(2002, 6, 4),  # Golden Jubilee
+    ("Spring Bank Holiday", 2012): date(2012, 6, 4),  # Diamond Jubilee
+    ("Spring Bank Holiday", 2022): date(2022, 6, 2),  # Platinum Jubilee
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian computus)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``th ``weekday`` (calendar.MONDAY...) of a month; negative ``n`` counts from the end."""
+    first_weekday, days_in_month = calendar.monthrange(year, month)
+    if n > 0:
+        day = 1 + (weekday - first_weekday) % 7 + (n - 1) * 7
+    else:
+        last_weekday = (first_weekday + days_in_month - 1) % 7
+        day = days_in_month - (last_weekday - weekday) % 7 + (n + 1) * 7
+    return date(year, month, day)
+
+
+def _year_dates(year: int) -> dict[str, date]:
+    easter = easter_sunday(year)
+    return {
+        "Mother's Day": easter - timedelta(days=21),  # Mothering Sunday, fourth Sunday of Lent
+        "Easter": easter,
+        "Early May Bank Holiday": nth_weekday(year, 5, calendar.MONDAY, 1),
+        "Spring Bank Holiday": nth_weekday(year, 5, calendar.MONDAY, -1),
+        "Father's Day": nth_weekday(year, 6, calendar.SUNDAY, 3),
+        "Summer Bank Holiday": nth_weekday(year, 8, calendar.MONDAY, -1),
+        # The day after US Thanksgiving, the fourth Thursday of November.
+        "Black Friday": nth_weekday(year, 11, calendar.THURSDAY, 4) + timedelta(days=1),
+    }
+
+
+def holiday_dates(start_year: int, end_year: int) -> dict[str, dict[int, date]]:
+    """Exact dates of every variable-date event for each year in the range, inclusive.
+
+    All rules are evaluated in a single pass over the years, sharing each
+    year's Easter date between the rules that depend on it.
+    """
+    dates: dict[str, dict[int, date]] = {}
+    for year in range(start_year, end_year + 1):
+        for name, event_date in _year_dates(year).items():
+            dates.setdefault(name, {})[year] = BANK_HOLIDAY_OVERRIDES.get((name, year), event_date)
+    return dates
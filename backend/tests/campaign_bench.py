@@ -0,0 +1,98 @@
+"""Helpers for the campaign list benchmarks.
+
+Each benchmark works in its own PostgreSQL schema, so seeded rows never
+mix with the tables other tests use and are dropped in one statement.
+"""
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, get_db
+from app.core.rate_limit import limiter
+from app.main import app
+from app.models.campaign import Campaign
+from tests.conftest import TEST_DATABASE_URL
+
+
+SEED_CAMPAIGNS = text("""
+    INSERT INTO campaigns (
+        business_name, business_type, target_audience, campaign_goal, key_messages, tone,
+        platforms, include_hashtags, include_emoji, generated_copies, image_prompt, created_at
+    )
+    SELECT
+        'Bench Bakery ' || i, 'bakery', repeat('Local families and commuters. ', 8),
+        repeat('Promote the new sourdough range. ', 8), repeat('Baked fresh every morning. ', 8),
+        'friendly and warm', '["Instagram", "Facebook", "X"]'::json, true, true,
+        json_build_array(
+            json_build_object('platform', 'Instagram', 'content', repeat('Fresh bread daily. ', :copy_sentences)),
+            json_build_object('platform', 'Facebook', 'content', repeat('Fresh bread daily. ', :copy_sentences)),
+            json_build_object('platform', 'X', 'content', 'Fresh bread. #ShopLocal')
+        ),
+        repeat('A rustic British bakery counter. ', 6),
+        TIMESTAMP '2025-01-01' + i * INTERVAL '1 second'
+    FROM generate_series(1, :rows) AS i
+""")
+
+
+def schema_engine(schema: str, **options) -> AsyncEngine:
+    """Engine whose connections resolve tables in ``schema``."""
+    connect_args = options.pop("connect_args", {})
+    return create_async_engine(
+        TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+        connect_args={**connect_args, "server_settings": {"search_path": schema}},
+        **options,
+    )
+
+
+async def create_schema(engine: AsyncEngine, schema: str, rows: int, copy_sentences: int = 60) -> None:
+    """Create ``schema`` holding ``rows`` campaigns, each with two long copies and a short one."""
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+        await conn.run_sync(Base.metadata.create_all, tables=[Campaign.__table__])
+        await conn.execute(SEED_CAMPAIGNS, {"rows": rows, "copy_sentences": copy_sentences})
+        await conn.execute(text("ANALYZE campaigns"))
+
+
+async def drop_schema(engine: AsyncEngine, schema: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+@asynccontextmanager
+async def api_client(engine: AsyncEngine):
+    """HTTP client for the app with ``get_db`` bound to ``engine`` and rate limits off."""
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = bench_db
+    enabled, limiter.enabled = limiter.enabled, False
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        limiter.enabled = enabled
+        app.dependency_overrides.pop(get_db)
+
+
+async def latencies(client: httpx.AsyncClient, url: str, requests: int) -> list[float]:
+    """Seconds taken by each of ``requests`` sequential GETs, after one warm-up request."""
+    (await client.get(url)).raise_for_status()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return samples
+
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
@@ -0,0 +1,117 @@
+"""A local stand-in for the Anthropic Message Batches API.
+
+It is served through ``httpx.MockTransport``, so the real SDK client talks
+to it over HTTP without leaving the process.
+"""
+import json
+import re
+import uuid
+
+import anthropic
+import httpx
+
+
+BASE_URL = "http://fake-anthropic.test"
+PLATFORM_LINE = re.compile(r"^- (\w+): Maximum \d+ characters$", re.MULTILINE)
+
+
+def copy_for_prompt(prompt: str) -> str:
+    """A marker-format response with one short copy per platform listed in the brief."""
+    blocks = [
+        f"[PLATFORM: {platform}]\n[COPY]\nFresh from the oven on {platform}! #ShopLocal\n[/COPY]\n"
+        for platform in PLATFORM_LINE.findall(prompt)
+    ]
+    return "\n".join(blocks) + "\n[IMAGE_PROMPT]\nA rustic British bakery counter\n[/IMAGE_PROMPT]\n"
+
+
+class FakeBatchServer:
+    """Batches stay in progress for ``polls_until_ended`` retrievals, then end.
+
+    Requests whose custom_id is in ``errored_ids`` come back as errored results.
+    """
+
+    def __init__(self, polls_until_ended: int = 1, errored_ids: set[str] | None = None):
+        self.polls_until_ended = polls_until_ended
+        self.errored_ids = errored_ids or set()
+        self.batches: dict[str, dict] = {}
+        self.created = 0
+        self.results_fetched = 0
+
+    def client(self, api_key: str) -> anthropic.AsyncAnthropic:
+        return anthropic.AsyncAnthropic(
+            api_key=api_key,
+            base_url=BASE_URL,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+            max_retries=0,
+        )
+
+    def _batch_json(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = batch["polls"] > self.polls_until_ended
+        total = len(batch["requests"])
+        errored = sum(r["custom_id"] in self.errored_ids for r in batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total - errored if ended else 0,
+                "errored": errored if ended else 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "results_url": f"{BASE_URL}/v1/messages/batches/{batch_id}/results" if ended else None,
+            "created_at": "2025-01-01T00:00:00Z",
+            "expires_at": "2025-01-02T00:00:00Z",
+            "ended_at": "2025-01-01T00:05:00Z" if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+        }
+
+    def _result_line(self, request: dict) -> str:
+        if request["custom_id"] in self.errored_ids:
+            result = {
+                "type": "errored",
+                "error": {"type": "error", "error": {"type": "invalid_request_error", "message": "Bad request"}},
+            }
+        else:
+            result = {
+                "type": "succeeded",
+                "message": {
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": request["params"]["model"],
+                    "content": [{"type": "text", "text": copy_for_prompt(request["params"]["messages"][0]["content"])}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {
+                        "input_tokens": 400,
+                        "output_tokens": 120,
+                        "cache_creation_input_tokens": 0,
+                        "cache_read_input_tokens": 0,
+                    },
+                },
+            }
+        return json.dumps({"custom_id": request["custom_id"], "result": result})
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/messages/batches":
+            batch_id = f"msgbatch_{uuid.uuid4().hex}"
+            self.batches[batch_id] = {"requests": json.loads(request.content)["requests"], "polls": 0}
+            self.created += 1
+            return httpx.Response(200, json=self._batch_json(batch_id))
+
+        match = re.fullmatch(r"/v1/messages/batches/(\w+)(/results)?", path)
+        if request.method == "GET" and match and match.group(1) in self.batches:
+            batch_id = match.group(1)
+            if match.group(2):
+                self.results_fetched += 1
+                lines = [self._result_line(r) for r in reversed(self.batches[batch_id]["requests"])]
+                return httpx.Response(200, content="\n".join(lines).encode(), headers={"content-type": "application/binary"})
+            self.batches[batch_id]["polls"] += 1
+            return httpx.Response(200, json=self._batch_json(batch_id))
+
+        return httpx.Response(404, json={"type": "error", "error": {"type": "not_found_error", "message": path}})
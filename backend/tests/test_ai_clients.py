@@ -0,0 +1,99 @@
+"""Client reuse through AIClientRegistry against a local stub Messages API.
+
+The stub is a real socket server, so connection setup is actually paid
+(without TLS, which would only widen the gap).
+"""
+import asyncio
+import json
+import time
+
+import anthropic
+
+from app.core.ai_clients import AIClientRegistry
+
+
+API_KEY = "sk-ant-" + "a" * 40
+CALLS = 50
+MESSAGE = json.dumps({
+    "id": "msg_stub",
+    "type": "message",
+    "role": "assistant",
+    "model": "claude-sonnet-4-20250514",
+    "content": [{"type": "text", "text": "Fresh from the oven!"}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 5},
+}).encode()
+
+
+class StubMessagesServer:
+    """Answers every HTTP/1.1 request with MESSAGE and counts TCP connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    + f"content-length: {len(MESSAGE)}\r\n\r\n".encode()
+                    + MESSAGE
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+
+
+async def create_message(client: anthropic.AsyncAnthropic) -> None:
+    await client.messages.create(
+        model="claude-sonnet-4-20250514",
+        max_tokens=16,
+        messages=[{"role": "user", "content": "Hello"}],
+    )
+
+
+async def test_registry_reuses_one_connection_and_beats_a_client_per_call(monkeypatch):
+    server = StubMessagesServer()
+    async with server as base_url:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", base_url)
+
+        registry = AIClientRegistry(idle_ttl=600, max_connections=10, max_keepalive_connections=10)
+        started = time.perf_counter()
+        for _ in range(CALLS):
+            await create_message(registry.get_anthropic(API_KEY))
+        reused = time.perf_counter() - started
+        await registry.aclose()
+        reused_connections = server.connections
+
+        # What every generation used to do: a new SDK client and connection pool.
+        started = time.perf_counter()
+        for _ in range(CALLS):
+            async with anthropic.AsyncAnthropic(api_key=API_KEY, max_retries=0) as client:
+                await create_message(client)
+        fresh = time.perf_counter() - started
+
+    print({"reused_ms_per_call": reused / CALLS * 1000, "fresh_ms_per_call": fresh / CALLS * 1000})
+    assert server.requests == 2 * CALLS
+    assert reused_connections == 1
+    assert server.connections - reused_connections == CALLS
+    assert reused < fresh
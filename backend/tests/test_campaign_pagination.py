@@ -0,0 +1,70 @@
+"""Keyset against OFFSET pagination, and estimated against exact totals, on 1M campaigns.
+
+Needs TEST_DATABASE_URL; skipped without one. Seeding takes about 20 seconds.
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import desc, select
+
+from app.models.campaign import Campaign
+from app.services.campaign_service import encode_cursor
+from tests.campaign_bench import api_client, create_schema, drop_schema, latencies, percentile, schema_engine
+from tests.conftest import TEST_DATABASE_URL
+
+
+SCHEMA = "bench_pagination"
+ROWS = 1_000_000
+DEEP_PAGE = 900_000
+REQUESTS = 20
+
+# Both tests share one seeded schema, so they also share its event loop.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = schema_engine(SCHEMA)
+    await create_schema(engine, SCHEMA, ROWS, copy_sentences=2)
+    yield engine
+    await drop_schema(engine, SCHEMA)
+    await engine.dispose()
+
+
+def report(name: str, samples: list[float]) -> str:
+    return f"{name}: p50 {percentile(samples, 50) * 1000:.2f} ms, p99 {percentile(samples, 99) * 1000:.2f} ms"
+
+
+async def test_cursor_page_is_faster_than_deep_offset(engine):
+    async with engine.connect() as conn:
+        previous = (await conn.execute(
+            select(Campaign.created_at, Campaign.id)
+            .order_by(desc(Campaign.created_at), desc(Campaign.id))
+            .offset(DEEP_PAGE - 1)
+            .limit(1)
+        )).one()
+    cursor = encode_cursor(previous)
+
+    async with api_client(engine) as client:
+        by_offset = await client.get(f"/api/v1/campaigns/?skip={DEEP_PAGE}&total=none")
+        by_cursor = await client.get(f"/api/v1/campaigns/?cursor={cursor}&total=none")
+        assert by_cursor.json()["campaigns"] == by_offset.json()["campaigns"]
+
+        offset = await latencies(client, f"/api/v1/campaigns/?skip={DEEP_PAGE}&total=none", REQUESTS)
+        keyset = await latencies(client, f"/api/v1/campaigns/?cursor={cursor}&total=none", REQUESTS)
+
+    print(report("offset", offset), report("cursor", keyset))
+    assert percentile(keyset, 50) < percentile(offset, 50)
+
+
+async def test_estimated_total_is_close_and_faster_than_count(engine):
+    async with api_client(engine) as client:
+        estimate = (await client.get("/api/v1/campaigns/?total=estimate")).json()["total"]
+        assert abs(estimate - ROWS) < ROWS * 0.05
+
+        exact = await latencies(client, "/api/v1/campaigns/?total=exact", REQUESTS)
+        estimated = await latencies(client, "/api/v1/campaigns/?total=estimate", REQUESTS)
+
+    print(report("exact", exact), report("estimate", estimated))
+    assert percentile(estimated, 50) < percentile(exact, 50)
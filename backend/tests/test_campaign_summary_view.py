@@ -0,0 +1,43 @@
+"""Payload size and latency of view=summary against the full campaign list.
+
+Needs TEST_DATABASE_URL; skipped without one.
+"""
+import pytest
+
+from tests.campaign_bench import api_client, create_schema, drop_schema, latencies, percentile, schema_engine
+from tests.conftest import TEST_DATABASE_URL
+
+
+SCHEMA = "bench_summary"
+ROWS = 10_000
+REQUESTS = 50
+FULL = "/api/v1/campaigns/?limit=100&total=none"
+SUMMARY = FULL + "&view=summary"
+
+
+@pytest.fixture
+async def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = schema_engine(SCHEMA)
+    await create_schema(engine, SCHEMA, ROWS)
+    yield engine
+    await drop_schema(engine, SCHEMA)
+    await engine.dispose()
+
+
+async def test_summary_view_is_smaller_and_faster(engine):
+    async with api_client(engine) as client:
+        full_page = await client.get(FULL)
+        summary_page = await client.get(SUMMARY)
+        assert [c["id"] for c in summary_page.json()["campaigns"]] == [c["id"] for c in full_page.json()["campaigns"]]
+
+        full = await latencies(client, FULL, REQUESTS)
+        summary = await latencies(client, SUMMARY, REQUESTS)
+
+    print({
+        "full": f"{len(full_page.content)} bytes, p50 {percentile(full, 50) * 1000:.2f} ms",
+        "summary": f"{len(summary_page.content)} bytes, p50 {percentile(summary, 50) * 1000:.2f} ms",
+    })
+    assert len(summary_page.content) * 5 < len(full_page.content)
+    assert percentile(summary, 50) < percentile(full, 50)
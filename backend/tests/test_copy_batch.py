@@ -0,0 +1,121 @@
+"""Message Batches jobs end to end against the local fake batch server.
+
+Needs TEST_DATABASE_URL for the job and campaign tables.
+"""
+import httpx
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_db
+from app.core.rate_limit import limiter
+from app.main import app
+from app.models.campaign import Campaign
+from app.models.copy_batch_job import CopyBatchJob
+from app.services import copy_batch_service
+from tests.fake_anthropic import FakeBatchServer
+
+
+API_KEY = "sk-ant-" + "a" * 40
+OTHER_KEY = "sk-ant-" + "b" * 40
+BUSINESS = "Batch Test Bakery"
+
+
+def brief(platforms: list[str]) -> dict:
+    return {
+        "business_name": BUSINESS,
+        "business_type": "bakery",
+        "target_audience": "local families",
+        "campaign_goal": "promote the new sourdough range",
+        "key_messages": "baked fresh every morning",
+        "platforms": platforms,
+    }
+
+
+@pytest.fixture
+async def session_factory(postgres_engine):
+    async with postgres_engine.begin() as conn:
+        for table in (Campaign.__table__, CopyBatchJob.__table__):
+            await conn.run_sync(table.create, checkfirst=True)
+    factory = async_sessionmaker(bind=postgres_engine, class_=AsyncSession, expire_on_commit=False)
+    yield factory
+    async with postgres_engine.begin() as conn:
+        await conn.execute(delete(Campaign).where(Campaign.business_name == BUSINESS))
+        await conn.execute(delete(CopyBatchJob).where(CopyBatchJob.briefs[0]["business_name"].as_string() == BUSINESS))
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeBatchServer(polls_until_ended=1, errored_ids={"1"})
+    monkeypatch.setattr(copy_batch_service.ai_clients, "get_anthropic", server.client)
+    return server
+
+
+@pytest.fixture
+async def client(session_factory, monkeypatch):
+    async def test_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    monkeypatch.setattr(limiter, "enabled", False)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db)
+
+
+async def saved_campaigns(session_factory) -> int:
+    async with session_factory() as db:
+        return (await db.execute(
+            select(func.count()).select_from(Campaign).where(Campaign.business_name == BUSINESS)
+        )).scalar_one()
+
+
+async def test_submit_poll_parse_and_save(client, fake_server, session_factory):
+    headers = {"X-Anthropic-Key": API_KEY}
+    response = await client.post(
+        "/api/v1/campaigns/batch-jobs",
+        json={"briefs": [brief(["Instagram", "X"]), brief(["Facebook"]), brief(["LinkedIn", "TikTok"])]},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "in_progress"
+    assert job["request_count"] == 3
+    assert fake_server.created == 1
+    [sent] = fake_server.batches.values()
+    assert [r["custom_id"] for r in sent["requests"]] == ["0", "1", "2"]
+
+    response = await client.get(f"/api/v1/campaigns/batch-jobs/{job['job_id']}", headers=headers)
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["completed_at"] is None
+
+    response = await client.get(f"/api/v1/campaigns/batch-jobs/{job['job_id']}", headers=headers)
+    ended = response.json()
+    assert ended["status"] == "ended"
+    assert (ended["succeeded_count"], ended["errored_count"]) == (2, 1)
+    results = ended["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [c["platform"] for c in results[0]["copies"]] == ["Instagram", "X"]
+    assert results[0]["image_prompt"] == "A rustic British bakery counter"
+    assert results[1] == {"index": 1, "success": False, "error": "errored"}
+    assert [c["platform"] for c in results[2]["copies"]] == ["LinkedIn", "TikTok"]
+    assert await saved_campaigns(session_factory) == 2
+
+    # Later polls return the stored results without fetching or saving them again.
+    response = await client.get(f"/api/v1/campaigns/batch-jobs/{job['job_id']}", headers=headers)
+    assert response.json()["results"] == results
+    assert fake_server.results_fetched == 1
+    assert await saved_campaigns(session_factory) == 2
+
+
+async def test_job_is_hidden_from_other_keys(client, fake_server):
+    response = await client.post(
+        "/api/v1/campaigns/batch-jobs",
+        json={"briefs": [brief(["X"])], "save": False},
+        headers={"X-Anthropic-Key": API_KEY},
+    )
+    job_id = response.json()["job_id"]
+
+    response = await client.get(f"/api/v1/campaigns/batch-jobs/{job_id}", headers={"X-Anthropic-Key": OTHER_KEY})
+    assert response.status_code == 404
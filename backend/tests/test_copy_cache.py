@@ -0,0 +1,69 @@
+"""Shared copy cache hits are only served to keys Anthropic has accepted."""
+import pytest
+
+from app.schemas.campaign import CampaignBrief, CopyGenerationResponse, PlatformCopy
+from app.services import copy_cache_service
+
+
+VERIFIED_KEY = "sk-ant-" + "a" * 40
+NEW_KEY = "sk-ant-" + "b" * 40
+BRIEF = CampaignBrief(
+    business_name="Crumbs & Co",
+    business_type="bakery",
+    target_audience="local families",
+    campaign_goal="promote the new sourdough range",
+    key_messages="baked fresh every morning",
+    platforms=["X"],
+)
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    calls = []
+
+    async def generate_copy(brief, api_key, include_image_prompt=True):
+        calls.append(api_key)
+        content = "Fresh sourdough daily. #ShopLocal"
+        return CopyGenerationResponse(
+            business_name=brief.business_name,
+            copies=[PlatformCopy(platform="X", content=content, character_count=len(content))],
+        )
+
+    monkeypatch.setattr(copy_cache_service, "generate_copy", generate_copy)
+    monkeypatch.setattr(copy_cache_service.settings, "copy_cache_shared", False)
+    copy_cache_service.memory_cache.clear()
+    copy_cache_service.verified_keys.clear()
+    yield calls
+    copy_cache_service.memory_cache.clear()
+    copy_cache_service.verified_keys.clear()
+
+
+async def generate(api_key: str) -> str:
+    _, status = await copy_cache_service.generate_copy_cached(None, BRIEF, api_key)
+    return status
+
+
+async def test_verified_key_gets_a_hit(generations):
+    assert await generate(VERIFIED_KEY) == "MISS"
+    assert await generate(VERIFIED_KEY) == "HIT"
+    assert generations == [VERIFIED_KEY]
+
+
+async def test_unseen_key_pays_one_generation_before_hits(generations):
+    assert await generate(VERIFIED_KEY) == "MISS"
+
+    assert await generate(NEW_KEY) == "MISS"
+    assert await generate(NEW_KEY) == "HIT"
+    assert generations == [VERIFIED_KEY, NEW_KEY]
+
+
+async def test_rejected_key_never_gets_a_hit(generations, monkeypatch):
+    assert await generate(VERIFIED_KEY) == "MISS"
+
+    async def rejected(brief, api_key, include_image_prompt=True):
+        raise RuntimeError("invalid x-api-key")
+
+    monkeypatch.setattr(copy_cache_service, "generate_copy", rejected)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await generate(NEW_KEY)
@@ -0,0 +1,72 @@
+"""Parse-failure rate of marker text against tool-use output.
+
+The fixtures hold twelve responses per mode: well-formed ones plus the
+ways a response can drift from the requested format (renamed platforms,
+truncation at max_tokens, markdown instead of markers). A response fails
+when any requested platform is left without its copy.
+"""
+import json
+from pathlib import Path
+
+import pytest
+from anthropic.types import Message
+
+from app.schemas.campaign import CampaignBrief, CopyGenerationResponse
+from app.services.claude_service import build_copy_response, build_tool_copy_response
+
+
+FIXTURES = json.loads((Path(__file__).parent / "fixtures" / "copy_responses.json").read_text())
+
+
+def brief(platforms: list[str]) -> CampaignBrief:
+    return CampaignBrief(
+        business_name="Crumbs & Co",
+        business_type="bakery",
+        target_audience="local families",
+        campaign_goal="promote the new sourdough range",
+        key_messages="baked fresh every morning",
+        platforms=platforms,
+    )
+
+
+def tool_message(fixture: dict) -> Message:
+    return Message.model_validate({
+        "id": "msg_fixture",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-sonnet-4-20250514",
+        "content": fixture["content"],
+        "stop_reason": fixture["stop_reason"],
+        "stop_sequence": None,
+        "usage": {"input_tokens": 900, "output_tokens": 300},
+    })
+
+
+def failed(fixture: dict, response: CopyGenerationResponse) -> bool:
+    return {c.platform for c in response.copies} != set(fixture["platforms"])
+
+
+def failures(mode: str) -> list[str]:
+    names = []
+    for fixture in FIXTURES[mode]:
+        if mode == "tool":
+            response = build_tool_copy_response(brief(fixture["platforms"]), tool_message(fixture))
+        else:
+            response = build_copy_response(brief(fixture["platforms"]), fixture["text"])
+        if failed(fixture, response):
+            names.append(fixture["name"])
+    return names
+
+
+def test_tool_mode_fails_less_often_than_markers():
+    markers, tool = failures("markers"), failures("tool")
+
+    print({mode: f"{len(names) / len(FIXTURES[mode]):.0%}" for mode, names in (("markers", markers), ("tool", tool))})
+    assert markers == [
+        "markdown headings instead of markers",
+        "copy tags dropped",
+        "platform renamed",
+        "cut off at max_tokens",
+        "json code block",
+    ]
+    assert tool == ["platform renamed", "cut off at max_tokens"]
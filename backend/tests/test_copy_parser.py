@@ -0,0 +1,174 @@
+"""Property and fuzz tests for the streaming copy parser.
+
+Random inputs come from fixed seeds, so failures are reproducible.
+"""
+import random
+import timeit
+
+import pytest
+
+from app.services.claude_service import parse_claude_response
+from app.schemas.campaign import PlatformCopy
+from app.services.copy_parser import MAX_MARKER_LENGTH, CopyResponseParser
+
+
+PLATFORMS = ["Instagram", "Facebook", "LinkedIn", "X", "TikTok"]
+BODY_ALPHABET = "abc def ghi [x] é🍞£\n#!:"
+FRAGMENTS = [
+    "[PLATFORM: Instagram]", "[platform:x ]", "[ PLATFORM : TikTok ]", "[PLATFORM: Myspace]",
+    "[COPY]", "[/COPY]", "[ copy ]", "[/ Copy]", "[IMAGE_PROMPT]", "[/IMAGE_PROMPT]", "[Image Prompt]",
+    "[", "]", "[PLATFORM:", "[/", "\n", " ", "[link in bio]", "word", "🍞", "£5", "[" + "x" * (MAX_MARKER_LENGTH + 5),
+    "[PLATFORM: " + "n" * 50 + "]", "[" + " " * 12 + "COPY]", "[IMAGE   PROMPT]",
+]
+
+
+def random_body(rnd: random.Random) -> str:
+    return "".join(rnd.choice(BODY_ALPHABET) for _ in range(rnd.randint(1, 300))).strip() or "copy"
+
+
+def well_formed_response(rnd: random.Random) -> tuple[str, dict[str, str], str]:
+    platforms = rnd.sample(PLATFORMS, rnd.randint(1, len(PLATFORMS)))
+    bodies = {platform: random_body(rnd) for platform in platforms}
+    image_prompt = random_body(rnd)
+    parts = ["Here is your copy [as requested]:\n\n"]
+    for platform, body in bodies.items():
+        parts.append(f"[PLATFORM: {platform}]\n[COPY]\n{body}\n[/COPY]\n\n")
+    parts.append(f"[IMAGE_PROMPT]\n{image_prompt}\n[/IMAGE_PROMPT]\n")
+    return "".join(parts), bodies, image_prompt
+
+
+def parse_in_chunks(text: str, platforms: list[str], rnd: random.Random) -> tuple[dict[str, str], str]:
+    parser = CopyResponseParser(platforms)
+    copies = []
+    position = 0
+    while position < len(text):
+        size = rnd.randint(1, 40)
+        copies += parser.feed(text[position:position + size])
+        position += size
+    copies += parser.finish()
+    return {c.platform: c.content for c in copies}, parser.image_prompt
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_well_formed_responses_round_trip(seed):
+    rnd = random.Random(seed)
+    for _ in range(50):
+        text, bodies, image_prompt = well_formed_response(rnd)
+        copies, parsed_prompt = parse_claude_response(text, PLATFORMS)
+
+        requested = [p for p in PLATFORMS if p in bodies]
+        assert [c.platform for c in copies] == requested
+        assert {c.platform: c.content for c in copies} == bodies
+        assert all(c.character_count == len(c.content) for c in copies)
+        assert parsed_prompt == image_prompt
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunked_parsing_matches_whole_text(seed):
+    rnd = random.Random(seed)
+    for _ in range(50):
+        text, _, _ = well_formed_response(rnd)
+        requested = rnd.sample(PLATFORMS, rnd.randint(1, len(PLATFORMS)))
+        copies, image_prompt = parse_claude_response(text, requested)
+
+        assert parse_in_chunks(text, requested, rnd) == ({c.platform: c.content for c in copies}, image_prompt)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fuzzed_marker_soup(seed):
+    rnd = random.Random(seed)
+    for _ in range(50):
+        text = "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(0, 60)))
+        requested = rnd.sample(PLATFORMS, rnd.randint(1, len(PLATFORMS)))
+        copies, image_prompt = parse_claude_response(text, requested)
+
+        platforms = [c.platform for c in copies]
+        assert len(platforms) == len(set(platforms))
+        assert set(platforms) <= set(requested)
+        assert all(c.content and c.content == c.content.strip() for c in copies)
+        assert parse_in_chunks(text, requested, rnd) == ({c.platform: c.content for c in copies}, image_prompt)
+
+
+def test_markers_tolerate_case_and_whitespace():
+    copies, image_prompt = parse_claude_response(
+        "[platform:instagram ]\n[ copy ]Hello[/Copy]\n[Image Prompt]A bakery[/image_prompt]",
+        ["Instagram"],
+    )
+
+    assert [(c.platform, c.content) for c in copies] == [("Instagram", "Hello")]
+    assert image_prompt == "A bakery"
+
+
+def test_copy_without_platform_goes_to_next_missing_platform():
+    copies, _ = parse_claude_response(
+        "[PLATFORM: X]\n[COPY]First[/COPY]\n[COPY]Second[/COPY]",
+        ["X", "Facebook"],
+    )
+
+    assert [(c.platform, c.content) for c in copies] == [("X", "First"), ("Facebook", "Second")]
+
+
+def test_unclosed_copy_is_kept():
+    copies, _ = parse_claude_response("[PLATFORM: X]\n[COPY]\nTruncated mid-sent", ["X"])
+
+    assert [(c.platform, c.content) for c in copies] == [("X", "Truncated mid-sent")]
+
+
+def test_unknown_and_repeated_platforms_are_ignored():
+    copies, _ = parse_claude_response(
+        "[PLATFORM: Myspace][COPY]Old[/COPY][PLATFORM: X][COPY]One[/COPY][PLATFORM: X][COPY]Two[/COPY]",
+        ["X"],
+    )
+
+    assert [(c.platform, c.content) for c in copies] == [("X", "One")]
+
+
+def test_copies_are_emitted_as_their_blocks_close():
+    parser = CopyResponseParser(["Instagram", "X"])
+
+    assert parser.feed("[PLATFORM: Instagram]\n[CO") == []
+    assert [c.platform for c in parser.feed("PY]\nHello[/COPY]\n[PLATFORM: X]\n[COPY]Hi")] == ["Instagram"]
+    assert [c.platform for c in parser.feed("[/COPY]")] == ["X"]
+    assert parser.finish() == []
+
+
+def find_based_parse(response_text: str, platforms: list[str]) -> tuple[list[PlatformCopy], str]:
+    """The previous ``parse_claude_response``: several ``find`` scans per platform."""
+    copies = []
+    image_prompt = ""
+
+    if "[IMAGE_PROMPT]" in response_text:
+        start = response_text.find("[IMAGE_PROMPT]") + len("[IMAGE_PROMPT]")
+        end = response_text.find("[/IMAGE_PROMPT]")
+        if end > start:
+            image_prompt = response_text[start:end].strip()
+
+    for platform in platforms:
+        marker = f"[PLATFORM: {platform}]"
+        if marker in response_text:
+            start = response_text.find(marker)
+            copy_start = response_text.find("[COPY]", start) + len("[COPY]")
+            copy_end = response_text.find("[/COPY]", start)
+
+            if copy_start > len("[COPY]") - 1 and copy_end > copy_start:
+                copy_text = response_text[copy_start:copy_end].strip()
+                copies.append(PlatformCopy(platform=platform, content=copy_text, character_count=len(copy_text)))
+
+    return copies, image_prompt
+
+
+def test_large_output_benchmark_against_find_based_parser():
+    # Five platforms of 2,000 words each (about 70 KB): roughly 250 us for the
+    # find-based parser and 70 us for the single pass on a laptop. On short
+    # responses the single pass is slower in absolute terms, at tens of microseconds.
+    rnd = random.Random(0)
+    bodies = {platform: " ".join(f"word{rnd.randint(0, 99)}" for _ in range(2000)) for platform in PLATFORMS}
+    text = "".join(f"[PLATFORM: {platform}]\n[COPY]\n{body}\n[/COPY]\n\n" for platform, body in bodies.items())
+    text += "[IMAGE_PROMPT]\nA loaf of bread\n[/IMAGE_PROMPT]\n"
+
+    assert parse_claude_response(text, PLATFORMS) == find_based_parse(text, PLATFORMS)
+
+    def best_of(parse) -> float:
+        return min(timeit.repeat(lambda: parse(text, PLATFORMS), number=10, repeat=5))
+
+    assert best_of(parse_claude_response) < best_of(find_based_parse)
@@ -0,0 +1,49 @@
+"""GET /api/v1/campaigns/ latency with a pooled engine against NullPool.
+
+Needs TEST_DATABASE_URL; skipped without one.
+"""
+import pytest
+
+from app.core import database
+from tests.campaign_bench import api_client, create_schema, drop_schema, latencies, percentile, schema_engine
+from tests.conftest import TEST_DATABASE_URL
+
+
+SCHEMA = "bench_pool"
+ROWS = 1_000
+REQUESTS = 200
+
+
+@pytest.fixture
+async def seeded():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = schema_engine(SCHEMA)
+    await create_schema(engine, SCHEMA, ROWS)
+    yield
+    await drop_schema(engine, SCHEMA)
+    await engine.dispose()
+
+
+async def list_latencies(monkeypatch, null_pool: bool) -> list[float]:
+    monkeypatch.setattr(database.settings, "database_null_pool", null_pool)
+    engine = schema_engine(SCHEMA, **database.get_engine_options())
+    try:
+        async with api_client(engine) as client:
+            return await latencies(client, "/api/v1/campaigns/?limit=10&total=none", REQUESTS)
+    finally:
+        await engine.dispose()
+
+
+async def test_pooled_engine_beats_null_pool(seeded, monkeypatch):
+    pooled = await list_latencies(monkeypatch, null_pool=False)
+    null_pool = await list_latencies(monkeypatch, null_pool=True)
+
+    report = {
+        name: f"p50 {percentile(samples, 50) * 1000:.2f} ms, p99 {percentile(samples, 99) * 1000:.2f} ms"
+        for name, samples in (("pooled", pooled), ("NullPool", null_pool))
+    }
+    print(report)
+    # NullPool opens a new connection per request; even over a local socket
+    # that costs more than the list query itself.
+    assert percentile(pooled, 50) < percentile(null_pool, 50)
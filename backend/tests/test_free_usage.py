@@ -0,0 +1,117 @@
+"""Free tier reservations must never exceed the daily limit, however many arrive at once.
+
+The concurrency tests need a real PostgreSQL database, given as
+TEST_DATABASE_URL; they are skipped without one.
+"""
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.free_usage import FreeUsage
+from app.services import free_usage_service
+from app.services.free_usage_accountant import FreeUsageAccountant
+
+
+TEST_IP = "203.0.113.7"
+DAILY_LIMIT = 5
+
+
+@pytest.fixture
+def daily_limit(monkeypatch):
+    monkeypatch.setattr(free_usage_service.settings, "free_tier_daily_limit", DAILY_LIMIT)
+    return DAILY_LIMIT
+
+
+@pytest.fixture
+async def session_factory(postgres_engine):
+    async with postgres_engine.begin() as conn:
+        await conn.run_sync(FreeUsage.__table__.create, checkfirst=True)
+        await conn.execute(delete(FreeUsage).where(FreeUsage.ip_address == TEST_IP))
+    yield async_sessionmaker(bind=postgres_engine, class_=AsyncSession, expire_on_commit=False)
+    async with postgres_engine.begin() as conn:
+        await conn.execute(delete(FreeUsage).where(FreeUsage.ip_address == TEST_IP))
+
+
+async def _reserve(session_factory) -> int | None:
+    async with session_factory() as db:
+        return await free_usage_service.reserve_slot(db, TEST_IP, date.today())
+
+
+async def test_concurrent_reservations_never_exceed_daily_limit(session_factory, daily_limit):
+    results = await asyncio.gather(*[_reserve(session_factory) for _ in range(50)])
+
+    granted = [remaining for remaining in results if remaining is not None]
+    assert sorted(granted) == list(range(daily_limit))
+
+    async with session_factory() as db:
+        usage = (await db.execute(
+            select(FreeUsage).where(FreeUsage.ip_address == TEST_IP, FreeUsage.usage_date == date.today())
+        )).scalar_one()
+    assert usage.generation_count == daily_limit
+
+
+async def test_released_slot_can_be_reserved_again(session_factory, daily_limit):
+    for _ in range(daily_limit):
+        assert await _reserve(session_factory) is not None
+    assert await _reserve(session_factory) is None
+
+    async with session_factory() as db:
+        await free_usage_service.release_slot(db, TEST_IP, date.today())
+
+    results = await asyncio.gather(*[_reserve(session_factory) for _ in range(10)])
+    assert [remaining for remaining in results if remaining is not None] == [0]
+
+
+async def test_release_after_midnight_refunds_the_reservation_day(session_factory, daily_limit):
+    yesterday = date.today() - timedelta(days=1)
+    async with session_factory() as db:
+        await free_usage_service.reserve_slot(db, TEST_IP, yesterday)
+        await free_usage_service.reserve_slot(db, TEST_IP, date.today())
+        await free_usage_service.release_slot(db, TEST_IP, yesterday)
+
+        counts = dict((await db.execute(
+            select(FreeUsage.usage_date, FreeUsage.generation_count).where(FreeUsage.ip_address == TEST_IP)
+        )).all())
+    assert counts == {yesterday: 0, date.today(): 1}
+
+
+def test_accountant_release_after_midnight_refunds_the_reservation_day():
+    accountant = FreeUsageAccountant(daily_limit=DAILY_LIMIT, flush_interval=60)
+    yesterday = date.today() - timedelta(days=1)
+    accountant._counts = {yesterday: {TEST_IP: 1}}
+    accountant._pending[yesterday][TEST_IP] += 1
+
+    # The first reservation after midnight drops yesterday's in-memory counters.
+    accountant._day_counts(date.today())[TEST_IP] = 1
+    accountant.release_slot(TEST_IP, yesterday)
+
+    assert accountant._pending[yesterday][TEST_IP] == 0
+    assert accountant._counts[date.today()][TEST_IP] == 1
+
+
+async def test_reserve_slot_is_one_conditional_upsert(daily_limit):
+    statements = []
+
+    class RecordingSession:
+        async def execute(self, statement):
+            statements.append(statement)
+
+            class Result:
+                def scalar_one_or_none(self):
+                    return 1
+            return Result()
+
+        async def commit(self):
+            pass
+
+    assert await free_usage_service.reserve_slot(RecordingSession(), TEST_IP, date.today()) == daily_limit - 1
+
+    assert len(statements) == 1
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_ip_date DO UPDATE" in sql
+    assert "WHERE free_usage.generation_count <" in sql
+    assert "RETURNING free_usage.generation_count" in sql
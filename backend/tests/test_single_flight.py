@@ -0,0 +1,146 @@
+"""Concurrent identical copy requests share one upstream call."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+from app.schemas.campaign import CampaignBrief
+from app.services import claude_service
+
+
+RESPONSE = """[PLATFORM: Instagram]
+[COPY]
+Fresh bread every morning at The Crumb Corner 🍞 #LeedsBakery
+[/COPY]
+
+[PLATFORM: X]
+[COPY]
+Our new sourdough range lands Saturday. #LeedsBakery
+[/COPY]
+
+[IMAGE_PROMPT]
+A rustic British bakery counter at dawn
+[/IMAGE_PROMPT]
+"""
+
+
+def make_brief(**overrides) -> CampaignBrief:
+    fields = {
+        "business_name": "The Crumb Corner",
+        "business_type": "bakery",
+        "target_audience": "local families",
+        "campaign_goal": "promote the new sourdough range",
+        "key_messages": "baked fresh every morning",
+        "platforms": ["Instagram", "X"],
+    }
+    return CampaignBrief(**{**fields, **overrides})
+
+
+class SlowMessages:
+    """Stands in for ``client.messages``: each create() takes ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=RESPONSE)],
+            usage=SimpleNamespace(
+                input_tokens=1200,
+                output_tokens=80,
+                cache_read_input_tokens=0,
+                cache_creation_input_tokens=0,
+            ),
+        )
+
+
+@pytest.fixture
+def slow_client(monkeypatch):
+    messages = SlowMessages(delay=0.2)
+    monkeypatch.setattr(claude_service.ai_clients, "get_anthropic", lambda api_key: SimpleNamespace(messages=messages))
+    return messages
+
+
+async def test_identical_concurrent_requests_make_one_call(slow_client):
+    brief = make_brief()
+    results = await asyncio.gather(*[claude_service.generate_copy(brief, "sk-ant-test") for _ in range(10)])
+
+    assert slow_client.calls == 1
+    assert all(r.model_dump() == results[0].model_dump() for r in results)
+    # Each caller gets its own copy, so one caller mutating it cannot affect another.
+    assert len({id(r) for r in results}) == len(results)
+    results[0].copies.clear()
+    assert results[1].copies
+
+
+async def test_different_requests_are_not_coalesced(slow_client):
+    await asyncio.gather(
+        claude_service.generate_copy(make_brief(), "sk-ant-test"),
+        claude_service.generate_copy(make_brief(tone="playful"), "sk-ant-test"),
+        claude_service.generate_copy(make_brief(), "sk-ant-other"),
+    )
+
+    assert slow_client.calls == 3
+
+
+async def test_later_requests_start_a_new_call(slow_client):
+    brief = make_brief()
+    await claude_service.generate_copy(brief, "sk-ant-test")
+    await claude_service.generate_copy(brief, "sk-ant-test")
+
+    assert slow_client.calls == 2
+
+
+async def test_error_reaches_every_waiter():
+    flights = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    results = await asyncio.gather(*[flights.do("key", failing) for _ in range(5)], return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+async def test_cancelling_one_waiter_keeps_the_call_running():
+    messages = SlowMessages(delay=0.2)
+    flights = SingleFlight()
+
+    first = asyncio.create_task(flights.do("key", messages.create))
+    second = asyncio.create_task(flights.do("key", messages.create))
+    await asyncio.sleep(0.05)
+    first.cancel()
+
+    result = await second
+    assert result.content[0].text == RESPONSE
+    assert messages.calls == 1
+    assert messages.cancelled == 0
+
+
+async def test_cancelling_every_waiter_cancels_the_call():
+    messages = SlowMessages(delay=1.0)
+    flights = SingleFlight()
+
+    waiter = asyncio.create_task(flights.do("key", messages.create))
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+
+    assert messages.cancelled == 1
+    assert not flights._flights
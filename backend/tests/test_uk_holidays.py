@@ -0,0 +1,99 @@
+"""Variable-date UK holidays checked against known dates for every year 2000-2100."""
+import calendar
+import timeit
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.seasonal_service import UK_EVENTS, get_upcoming_events
+from app.services.uk_holidays import BANK_HOLIDAY_OVERRIDES, easter_sunday, holiday_dates, nth_weekday
+
+
+YEARS = range(2000, 2101)
+DATES = holiday_dates(YEARS.start, YEARS.stop - 1)
+
+# Published dates (gov.uk bank holidays; Mothering Sunday, Father's Day and Black Friday calendars).
+KNOWN_DATES = {
+    "Easter": [date(2000, 4, 23), date(2008, 3, 23), date(2011, 4, 24), date(2019, 4, 21),
+               date(2024, 3, 31), date(2025, 4, 20), date(2038, 4, 25), date(2100, 3, 28)],
+    "Mother's Day": [date(2008, 3, 2), date(2024, 3, 10), date(2025, 3, 30), date(2026, 3, 15)],
+    "Early May Bank Holiday": [date(2018, 5, 7), date(2019, 5, 6), date(2020, 5, 8), date(2021, 5, 3),
+                               date(2022, 5, 2), date(2023, 5, 1), date(2024, 5, 6), date(2025, 5, 5),
+                               date(2026, 5, 4), date(2027, 5, 3)],
+    "Spring Bank Holiday": [date(2002, 6, 4), date(2012, 6, 4), date(2018, 5, 28), date(2019, 5, 27),
+                            date(2020, 5, 25), date(2021, 5, 31), date(2022, 6, 2), date(2023, 5, 29),
+                            date(2024, 5, 27), date(2025, 5, 26), date(2026, 5, 25), date(2027, 5, 31)],
+    "Father's Day": [date(2023, 6, 18), date(2024, 6, 16), date(2025, 6, 15), date(2026, 6, 21)],
+    "Summer Bank Holiday": [date(2018, 8, 27), date(2019, 8, 26), date(2020, 8, 31), date(2021, 8, 30),
+                            date(2022, 8, 29), date(2023, 8, 28), date(2024, 8, 26), date(2025, 8, 25),
+                            date(2026, 8, 31), date(2027, 8, 30)],
+    "Black Friday": [date(2019, 11, 29), date(2023, 11, 24), date(2024, 11, 29), date(2025, 11, 28),
+                     date(2026, 11, 27)],
+}
+
+
+def weekdays_in_month(year: int, month: int, weekday: int) -> list[date]:
+    """Reference implementation: every ``weekday`` of the month, found by walking the days."""
+    days = [date(year, month, day) for day in range(1, calendar.monthrange(year, month)[1] + 1)]
+    return [day for day in days if day.weekday() == weekday]
+
+
+def expected(name: str, year: int, rule_date: date) -> date:
+    return BANK_HOLIDAY_OVERRIDES.get((name, year), rule_date)
+
+
+@pytest.mark.parametrize(("name", "known"), KNOWN_DATES.items())
+def test_known_dates(name, known):
+    for day in known:
+        assert DATES[name][day.year] == day
+
+
+def test_every_variable_event_has_a_rule():
+    variable = {event["name"] for event in UK_EVENTS if event.get("variable")}
+    assert variable == set(DATES)
+    assert all(set(DATES[name]) == set(YEARS) for name in variable)
+
+
+def test_easter_matches_dateutil():
+    dateutil_easter = pytest.importorskip("dateutil.easter")
+    for year in range(1583, 4100):
+        assert easter_sunday(year) == dateutil_easter.easter(year)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_rules_match_reference(year):
+    easter = easter_sunday(year)
+    assert DATES["Easter"][year] == easter
+    assert DATES["Easter"][year].weekday() == calendar.SUNDAY
+    assert DATES["Mother's Day"][year] == easter - timedelta(weeks=3)
+
+    mondays_in_may = weekdays_in_month(year, 5, calendar.MONDAY)
+    assert DATES["Early May Bank Holiday"][year] == expected("Early May Bank Holiday", year, mondays_in_may[0])
+    assert DATES["Spring Bank Holiday"][year] == expected("Spring Bank Holiday", year, mondays_in_may[-1])
+    assert DATES["Father's Day"][year] == weekdays_in_month(year, 6, calendar.SUNDAY)[2]
+    assert DATES["Summer Bank Holiday"][year] == weekdays_in_month(year, 8, calendar.MONDAY)[-1]
+    assert DATES["Black Friday"][year] == weekdays_in_month(year, 11, calendar.THURSDAY)[3] + timedelta(days=1)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_nth_weekday_matches_reference_for_every_month(year):
+    for month in range(1, 13):
+        for weekday in range(7):
+            days = weekdays_in_month(year, month, weekday)
+            for n in range(1, len(days) + 1):
+                assert nth_weekday(year, month, weekday, n) == days[n - 1]
+                assert nth_weekday(year, month, weekday, -n) == days[-n]
+
+
+def test_seasonal_calendar_uses_exact_dates():
+    upcoming = {event["name"]: event["date"] for event in get_upcoming_events(date(2026, 3, 10))}
+
+    assert upcoming["Mother's Day"] == "2026-03-15"
+    assert upcoming["Easter"] == "2026-04-05"
+    assert upcoming["Early May Bank Holiday"] == "2026-05-04"
+
+
+def test_century_benchmark():
+    # About 1 ms on a laptop; the bound only catches an accidental blow-up.
+    seconds = min(timeit.repeat(lambda: holiday_dates(2000, 2099), number=1, repeat=5))
+    assert seconds < 0.1
@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.core.upstream import UpstreamScheduler
+
+
+def _server_error() -> openai.InternalServerError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/images/generations")
+    response = httpx.Response(500, request=request)
+    return openai.InternalServerError("boom", response=response, body=None)
+
+
+async def _count_calls(scheduler: UpstreamScheduler, **kwargs) -> int:
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        raise _server_error()
+
+    with pytest.raises(openai.InternalServerError):
+        await scheduler.call("openai", "sk-test", request, **kwargs)
+    return calls
+
+
+async def test_retryable_errors_are_retried(monkeypatch):
+    monkeypatch.setattr("app.core.upstream.settings.upstream_max_retries", 2)
+    monkeypatch.setattr("app.core.upstream.settings.upstream_backoff_base_seconds", 0)
+    assert await _count_calls(UpstreamScheduler()) == 3
+
+
+async def test_retries_zero_makes_a_single_attempt(monkeypatch):
+    monkeypatch.setattr("app.core.upstream.settings.upstream_max_retries", 2)
+    assert await _count_calls(UpstreamScheduler(), retries=0) == 1
+
+
+async def test_deadline_overrides_default(monkeypatch):
+    monkeypatch.setattr("app.core.upstream.settings.upstream_deadline_seconds", 0.01)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert await UpstreamScheduler().call("anthropic", "sk-test", slow, deadline=1) == "done"